@@ -0,0 +1,139 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Booking, BookingStatus, Place, PlaceDailyStats, RollupWatermark
+from .occupancy import get_covered_slots
+from .utils import get_time_slots
+
+
+WATERMARK_NAME = 'place_daily_stats'
+# Брони, сохранённые незадолго до водяного знака, могли закоммититься уже после
+# прошлого запуска, поэтому окно пересчёта перекрывается с предыдущим
+WATERMARK_OVERLAP = timedelta(minutes=5)
+ROLLUP_CHUNK_SIZE = 500
+
+STATS_FIELDS = ['bookings', 'completed', 'cancelled', 'booked_slots', 'capacity_slots']
+
+
+def mark_stale(place_id, date):
+    PlaceDailyStats.objects.filter(place_id=place_id, date=date).update(stale=True)
+
+
+def rebuild_daily_stats(pairs):
+    """Пересчитывает сводку для пар (place_id, date) по актуальным броням."""
+    by_place = defaultdict(set)
+    for place_id, date in pairs:
+        by_place[place_id].add(date)
+    if not by_place:
+        return
+
+    lookup = Q()
+    for place_id, dates in by_place.items():
+        lookup |= Q(place_id=place_id, date__in=dates)
+
+    places = Place.objects.in_bulk(by_place)
+    stats = {
+        (place_id, date): PlaceDailyStats(
+            place_id=place_id,
+            date=date,
+            capacity_slots=places[place_id].capacity * len(get_time_slots(places[place_id], date))
+        )
+        for place_id, dates in by_place.items() if place_id in places
+        for date in dates
+    }
+
+    bookings = Booking.objects.filter(lookup).order_by().values_list(
+        'place_id', 'date', 'start_time', 'end_time', 'status'
+    )
+    for place_id, date, start_time, end_time, status in bookings:
+        row = stats[place_id, date]
+        row.bookings += 1
+        if status == BookingStatus.CANCELLED:
+            row.cancelled += 1
+            continue
+        if status == BookingStatus.COMPLETED:
+            row.completed += 1
+        row.booked_slots += len(get_covered_slots(places[place_id], date, start_time, end_time))
+
+    empty = Q()
+    for key, row in stats.items():
+        if not row.bookings:
+            empty |= Q(place_id=key[0], date=key[1])
+
+    with transaction.atomic():
+        if empty:
+            PlaceDailyStats.objects.filter(empty).delete()
+        PlaceDailyStats.objects.bulk_create(
+            [row for row in stats.values() if row.bookings],
+            update_conflicts=True,
+            unique_fields=['place', 'date'],
+            update_fields=[*STATS_FIELDS, 'stale', 'updated_at']
+        )
+
+
+def rollup_daily_stats():
+    """
+    Пересчитывает только пары (place, date), брони которых менялись после
+    водяного знака, и строки, помеченные stale. Возвращает число пересчитанных пар.
+    """
+    started = timezone.now()
+    watermark = RollupWatermark.objects.filter(name=WATERMARK_NAME).values_list('value', flat=True).first()
+
+    changed = Booking.objects.order_by()
+    if watermark is not None:
+        changed = changed.filter(updated_at__gt=watermark - WATERMARK_OVERLAP)
+
+    pairs = set(changed.values_list('place_id', 'date').distinct())
+    pairs |= set(PlaceDailyStats.objects.filter(stale=True).values_list('place_id', 'date'))
+    pairs = sorted(pairs)
+
+    for start in range(0, len(pairs), ROLLUP_CHUNK_SIZE):
+        rebuild_daily_stats(pairs[start:start + ROLLUP_CHUNK_SIZE])
+
+    RollupWatermark.objects.update_or_create(name=WATERMARK_NAME, defaults={'value': started})
+    return len(pairs)
+
+
+def get_rates(values):
+    capacity_slots, bookings = values['capacity_slots'], values['bookings']
+    return {
+        'fill_rate': round(values['booked_slots'] / capacity_slots, 4) if capacity_slots else 0,
+        'cancellation_rate': round(values['cancelled'] / bookings, 4) if bookings else 0,
+    }
+
+
+def build_place_analytics(place, from_date, to_date):
+    """
+    Отчёт по загрузке объекта за диапазон дат из сводной таблицы одним запросом.
+    Дни без броней заполняются нулями с текущей вместимостью объекта.
+    """
+    rows = {
+        row['date']: row
+        for row in PlaceDailyStats.objects.filter(
+            place=place, date__gte=from_date, date__lte=to_date
+        ).values('date', *STATS_FIELDS)
+    }
+    empty_day = dict.fromkeys(STATS_FIELDS, 0)
+    empty_day['capacity_slots'] = place.capacity * len(get_time_slots(place, from_date))
+
+    totals = dict.fromkeys(STATS_FIELDS, 0)
+    days = []
+    date = from_date
+    while date <= to_date:
+        values = {field: rows.get(date, empty_day)[field] for field in STATS_FIELDS}
+        for field in STATS_FIELDS:
+            totals[field] += values[field]
+        days.append({'date': date.isoformat(), **values, **get_rates(values)})
+        date += timedelta(days=1)
+
+    return {
+        'place': place.pk,
+        'from': from_date.isoformat(),
+        'to': to_date.isoformat(),
+        'totals': {**totals, **get_rates(totals)},
+        'days': days,
+    }
@@ -0,0 +1,237 @@
+import statistics
+import time
+from datetime import time as day_time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from bronkz.instrumentation import collect_queries
+from bronkz.renderers import MessagePackRenderer, ORJSONRenderer
+from .models import Booking, BookingStatus, Place
+from .occupancy import build_available_times
+from .serializers import BookingSerializer
+from .tasks import auto_complete_bookings
+
+
+SCENARIOS = {}
+RENDERERS = {
+    'json': JSONRenderer,
+    'orjson': ORJSONRenderer,
+    'msgpack': MessagePackRenderer,
+}
+
+
+def scenario(name, mutates=False):
+    """Регистрирует сценарий. Изменения мутирующих сценариев откатываются после замера."""
+    def register(func):
+        SCENARIOS[name] = (func, mutates)
+        return func
+    return register
+
+
+class BenchmarkSubject:
+    """Данные, на которых гоняются сценарии: самый активный пользователь и самый загруженный объект."""
+
+    def __init__(self):
+        today = timezone.localdate()
+        self.user = get_user_model().objects.annotate(
+            bookings=Count('booking')
+        ).order_by('-bookings', 'id').first()
+        self.place = Place.objects.annotate(
+            bookings=Count('booking')
+        ).order_by('-bookings', 'id').first()
+        if self.user is None or self.place is None:
+            raise ValueError("Нет данных для замеров: запустите generate_fake_data")
+
+        self.date = today + timedelta(days=1)
+        busiest = Booking.objects.filter(place=self.place, date__gt=today).values('date').annotate(
+            count=Count('id')
+        ).order_by('-count', 'date').first()
+        if busiest:
+            self.date = busiest['date']
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def free_slot(self):
+        """Свободный слот для сценария создания брони; ищется вне замера."""
+        day = self.date
+        for _ in range(60):
+            for slot in build_available_times(self.place, day):
+                if slot['availabe']:
+                    return day, slot['start_time'], slot['end_time']
+            day += timedelta(days=1)
+        raise ValueError("Не найден свободный слот для создания брони")
+
+
+def check(response):
+    if response.status_code >= 400:
+        raise AssertionError(f"{response.status_code}: {response.content[:500]!r}")
+    return response
+
+
+@scenario('available_times')
+def available_times(subject):
+    check(subject.client.get(
+        f'/api/places/{subject.place.pk}/available-times/', {'date': subject.date.isoformat()}
+    ))
+
+
+@scenario('available')
+def available(subject):
+    check(subject.client.get('/api/places/available/', {'date': subject.date.isoformat(), 'time': '18:00'}))
+
+
+@scenario('nearby')
+def nearby(subject):
+    check(subject.client.get('/api/places/nearby/', {
+        'lat': subject.place.latitude or 55.75,
+        'lon': subject.place.longitude or 37.62,
+        'radius': 5,
+        'date': subject.date.isoformat(),
+        'time': '18:00',
+    }))
+
+
+@scenario('booking_create', mutates=True)
+def booking_create(subject, slot):
+    day, start_time, end_time = slot
+    check(subject.client.post('/api/bookings/', {
+        'place': subject.place.pk,
+        'date': day.isoformat(),
+        'start_time': start_time,
+        'end_time': end_time,
+    }, format='json'))
+
+
+@scenario('my')
+def my(subject):
+    check(subject.client.get('/api/bookings/my/'))
+
+
+@scenario('stats')
+def stats(subject):
+    check(subject.client.get('/api/users/me/stats/'))
+
+
+@scenario('auto_complete_bookings', mutates=True)
+def auto_complete(subject):
+    auto_complete_bookings()
+
+
+class Rollback(Exception):
+    pass
+
+
+def measure(func, *args, mutates=False):
+    start = time.perf_counter()
+    with collect_queries() as collector:
+        if mutates:
+            try:
+                with transaction.atomic():
+                    func(*args)
+                    raise Rollback
+            except Rollback:
+                pass
+        else:
+            func(*args)
+    return {
+        'wall_ms': (time.perf_counter() - start) * 1000,
+        'db_ms': collector.duration * 1000,
+        'queries': collector.queries,
+        'rows': collector.rows,
+    }
+
+
+def run_benchmarks(names=None, repeat=5, warm=False):
+    """
+    Прогоняет сценарии repeat раз и возвращает сводку по каждому: время
+    (min/median/max), время в БД, число запросов и затронутых строк (медианы).
+    Без warm кэш очищается перед каждым прогоном, то есть замеряется путь через БД.
+    """
+    subject = BenchmarkSubject()
+    results = {}
+    for name in names or SCENARIOS:
+        func, mutates = SCENARIOS[name]
+        args = [subject]
+        if name == 'booking_create':
+            args.append(subject.free_slot())
+
+        runs = []
+        for _ in range(repeat):
+            if not warm:
+                cache.clear()
+            runs.append(measure(func, *args, mutates=mutates))
+
+        wall = [run['wall_ms'] for run in runs]
+        results[name] = {
+            'runs': repeat,
+            'wall_ms': {
+                'min': round(min(wall), 3),
+                'median': round(statistics.median(wall), 3),
+                'max': round(max(wall), 3),
+            },
+            'db_ms': round(statistics.median(run['db_ms'] for run in runs), 3),
+            'queries': int(statistics.median(run['queries'] for run in runs)),
+            'rows': int(statistics.median(run['rows'] for run in runs)),
+        }
+    return results
+
+
+def build_bookings(count):
+    """Брони в памяти, без обращений к БД: замеряется только сериализация и рендеринг."""
+    now = timezone.now()
+    statuses = BookingStatus.values
+    return [
+        Booking(
+            pk=index + 1,
+            user_id=index % 500 + 1,
+            place_id=index % 100 + 1,
+            date=now.date() + timedelta(days=index % 60),
+            start_time=day_time(8 + index % 12),
+            end_time=day_time(9 + index % 12),
+            status=statuses[index % len(statuses)],
+            created_at=now - timedelta(minutes=index),
+            updated_at=now
+        )
+        for index in range(count)
+    ]
+
+
+def run_renderer_benchmarks(count=10000, repeat=5):
+    """
+    Время сериализации BookingSerializer(many=True) и рендеринга результата
+    каждым рендерером (медианы по repeat прогонам) и размер ответа. В каждом
+    прогоне все рендереры получают одни и те же данные, поэтому разница
+    во времени приходится только на рендеринг.
+    """
+    bookings = build_bookings(count)
+    renderers = {name: renderer_class() for name, renderer_class in RENDERERS.items()}
+    serialize = []
+    render = {name: [] for name in renderers}
+    sizes = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = BookingSerializer(bookings, many=True).data
+        serialize.append((time.perf_counter() - start) * 1000)
+
+        for name, renderer in renderers.items():
+            start = time.perf_counter()
+            sizes[name] = len(renderer.render(data, renderer.media_type, {}))
+            render[name].append((time.perf_counter() - start) * 1000)
+
+    serialize_ms = statistics.median(serialize)
+    return {
+        name: {
+            'serialize_ms': round(serialize_ms, 3),
+            'render_ms': round(statistics.median(render[name]), 3),
+            'total_ms': round(serialize_ms + statistics.median(render[name]), 3),
+            'bytes': sizes[name],
+        }
+        for name in renderers
+    }
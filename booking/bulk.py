@@ -0,0 +1,114 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from logs.activity import log_activity
+from .cache import invalidate_booking_slots
+from .models import Booking, Place, SlotOccupancy
+from .occupancy import CAPACITY_ERROR, OccupancyContext, get_covered_slots
+from .serializers import BulkBookingItemSerializer
+from .validation import validate_booking_time
+
+
+def create_bookings(user, items):
+    """
+    Создаёт пакет броней в одной транзакции. Все элементы проверяются по одному
+    снимку занятости: строки SlotOccupancy блокируются одним SELECT ... FOR UPDATE,
+    места распределяются в памяти, брони вставляются bulk_create, записи журнала
+    пишутся одной пачкой после коммита.
+    Возвращает результат для каждого элемента в исходном порядке.
+    """
+    results = [None] * len(items)
+
+    validated = []
+    for index, item in enumerate(items):
+        serializer = BulkBookingItemSerializer(data=item)
+        if serializer.is_valid():
+            validated.append((index, serializer.validated_data))
+        else:
+            results[index] = {'index': index, 'status': 'invalid', 'errors': serializer.errors}
+
+    places = Place.objects.in_bulk({data['place'] for _, data in validated})
+    candidates = []
+    for index, data in validated:
+        place = places.get(data['place'])
+        if place is None:
+            results[index] = {'index': index, 'status': 'invalid', 'errors': {'place': ["Объект не найден."]}}
+            continue
+
+        try:
+            validate_booking_time(place, data['date'], data['start_time'], data['end_time'], strict=True)
+        except ValidationError as exc:
+            results[index] = {'index': index, 'status': 'invalid', 'errors': {'non_field_errors': exc.messages}}
+            continue
+
+        slot_keys = [
+            (place.pk, data['date'], slot_start)
+            for slot_start in get_covered_slots(place, data['date'], data['start_time'], data['end_time'])
+        ]
+        candidates.append((index, place, data, slot_keys))
+
+    if not candidates:
+        return results
+
+    with transaction.atomic():
+        slot_keys = sorted({key for _, _, _, keys in candidates for key in keys})
+        SlotOccupancy.objects.bulk_create(
+            [SlotOccupancy(place_id=place_id, date=date, slot_start=slot_start)
+             for place_id, date, slot_start in slot_keys],
+            ignore_conflicts=True
+        )
+
+        lookup = Q()
+        for place_id, date, slot_start in slot_keys:
+            lookup |= Q(place_id=place_id, date=date, slot_start=slot_start)
+        rows = {
+            (row.place_id, row.date, row.slot_start): row
+            for row in SlotOccupancy.objects.select_for_update().filter(lookup).order_by(
+                'place_id', 'date', 'slot_start'
+            )
+        }
+        context = OccupancyContext(rows.values())
+
+        bookings = []
+        changed = {}
+        for index, place, data, keys in candidates:
+            date, start_time, end_time = data['date'], data['start_time'], data['end_time']
+            if not context.has_capacity(place, date, start_time, end_time):
+                results[index] = {'index': index, 'status': 'conflict', 'error': CAPACITY_ERROR}
+                continue
+
+            context.occupy(place, date, start_time, end_time)
+            for key in keys:
+                changed[key] = place
+            bookings.append((index, Booking(
+                user=user,
+                place=place,
+                date=date,
+                start_time=start_time,
+                end_time=end_time
+            )))
+
+        for key, place in changed.items():
+            _, date, slot_start = key
+            rows[key].used = context.get_used(place, date)[slot_start]
+        SlotOccupancy.objects.bulk_update([rows[key] for key in changed], ['used'])
+        Booking.objects.bulk_create([booking for _, booking in bookings])
+
+        for _, booking in bookings:
+            log_activity(
+                user=user,
+                action='Создал бронь',
+                content_object=booking
+            )
+
+        for place_id, date in {(booking.place_id, booking.date) for _, booking in bookings}:
+            transaction.on_commit(
+                lambda place_id=place_id, date=date: invalidate_booking_slots(place_id, date)
+            )
+
+    for index, booking in bookings:
+        booking.occupied_key = booking.get_occupancy_key()
+        results[index] = {'index': index, 'status': 'created', 'id': booking.pk}
+
+    return results
@@ -0,0 +1,140 @@
+import time
+
+from django.core.cache import cache
+
+from bronkz.metrics import CACHE_REQUESTS
+
+
+AVAILABILITY_TIMEOUT = 60 * 10
+# Версия живёт дольше закэшированных по ней данных, но не вечно: ключи для
+# объектов и дат, к которым давно не обращались, вытесняются сами
+VERSION_TIMEOUT = AVAILABILITY_TIMEOUT * 4
+
+PLACES_VERSION_KEY = 'availability:version:places'
+HITS_KEY = 'availability:stats:hits'
+MISSES_KEY = 'availability:stats:misses'
+
+
+def place_version_key(place_id):
+    return f'availability:version:place:{place_id}'
+
+
+def date_version_key(date):
+    return f'availability:version:date:{date.isoformat()}'
+
+
+def slots_version_key(place_id, date):
+    return f'availability:version:slots:{place_id}:{date.isoformat()}'
+
+
+def get_versions(*keys):
+    """
+    Версии кэша для ключей. Отсутствующая версия инициализируется текущим временем,
+    чтобы после вытеснения ключа не совпасть со старыми закэшированными ответами.
+    Если Redis недоступен (IGNORE_EXCEPTIONS), версия равна None: такие версии
+    не попадают ни в ключи, ни в ETag, иначе ответы застыли бы до восстановления кэша.
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), VERSION_TIMEOUT)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), VERSION_TIMEOUT)
+
+
+def available_times_version(place_id, date):
+    """Версия слотов объекта на дату: меняется при изменении объекта и броней на эту дату."""
+    versions = get_versions(place_version_key(place_id), slots_version_key(place_id, date))
+    if None in versions:
+        return None
+    return '.'.join(map(str, versions))
+
+
+def available_times_key(place_id, date):
+    version = available_times_version(place_id, date)
+    if version is None:
+        return None
+    return f'availability:times:{place_id}:{date.isoformat()}:{version}'
+
+
+def place_etag(place_id):
+    version, = get_versions(place_version_key(place_id))
+    if version is None:
+        return None
+    return f'"place-{place_id}-{version}"'
+
+
+def places_etag():
+    version, = get_versions(PLACES_VERSION_KEY)
+    if version is None:
+        return None
+    return f'"places-{version}"'
+
+
+def available_times_etag(place_id, date):
+    version = available_times_version(place_id, date)
+    if version is None:
+        return None
+    return f'"times-{place_id}-{date.isoformat()}-{version}"'
+
+
+def available_places_key(date, time_value, params):
+    places_version, date_version = get_versions(PLACES_VERSION_KEY, date_version_key(date))
+    if places_version is None or date_version is None:
+        return None
+    suffix = ':'.join(str(params.get(name) or '') for name in ('category', 'page', 'page_size'))
+    return (
+        f'availability:places:rows:{places_version}:{date_version}:'
+        f'{date.isoformat()}:{time_value.strftime("%H:%M")}:{suffix}'
+    )
+
+
+def get_or_build(key, build):
+    """Данные из кэша по ключу или результат build(). Без ключа (кэш недоступен) — всегда build()."""
+    if key is None:
+        return build()
+
+    data = cache.get(key)
+    if data is not None:
+        _count(HITS_KEY)
+        CACHE_REQUESTS.inc(result='hit')
+        return data
+
+    _count(MISSES_KEY)
+    CACHE_REQUESTS.inc(result='miss')
+    data = build()
+    cache.set(key, data, AVAILABILITY_TIMEOUT)
+    return data
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_cache_stats():
+    stats = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {
+        'hits': stats.get(HITS_KEY, 0),
+        'misses': stats.get(MISSES_KEY, 0),
+    }
+
+
+def invalidate_booking_slots(place_id, date):
+    bump_version(slots_version_key(place_id, date))
+    bump_version(date_version_key(date))
+
+
+def invalidate_place(place_id):
+    bump_version(place_version_key(place_id))
+    bump_version(PLACES_VERSION_KEY)
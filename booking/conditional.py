@@ -0,0 +1,44 @@
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+def representation_etag(request, etag):
+    """
+    ETag конкретного представления: JSON, MessagePack и HTML-версия одного
+    ответа различаются байтами, поэтому тег включает согласованный тип.
+    """
+    media_type = ''.join(request.accepted_media_type.split()).replace('"', '')
+    return f'{etag[:-1]};{media_type}"'
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    Ответ 304 для GET/HEAD, если валидаторы клиента совпадают с текущими,
+    иначе None. If-None-Match проверяется раньше If-Modified-Since.
+    Без ETag (версии недоступны) 304 не отдаётся: Last-Modified в одиночку
+    не отражает изменения броней и менеджеров.
+    """
+    if etag is None:
+        return None
+    etag = representation_etag(request, etag)
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None
+    )
+    if response is not None:
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def set_validators(request, response, etag, last_modified=None):
+    if etag is not None:
+        response['ETag'] = representation_etag(request, etag)
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Клиент может хранить ответ, но обязан перепроверить его перед использованием
+    response['Cache-Control'] = 'no-cache'
+    # Представление выбирается по Accept, и общие кэши должны это учитывать
+    patch_vary_headers(response, ['Accept'])
+    return response
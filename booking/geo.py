@@ -0,0 +1,86 @@
+from math import asin, cos, degrees, floor, radians, sin
+
+from django.db.models import BigIntegerField, F, FloatField, Q
+from django.db.models.functions import ASin, Cast, Cos, Floor, Least, Power, Radians, Sin, Sqrt
+
+
+EARTH_RADIUS_KM = 6371.0
+# Ячейка сетки 0.1° x 0.1°: около 11 км по широте, меньше по долготе ближе к полюсам
+GRID_CELL_DEGREES = 0.1
+GRID_COLUMNS = 3600
+
+
+def grid_row(latitude):
+    return floor((latitude + 90) / GRID_CELL_DEGREES)
+
+
+def grid_column(longitude):
+    return min(floor((longitude + 180) / GRID_CELL_DEGREES), GRID_COLUMNS - 1)
+
+
+def grid_cell(latitude, longitude):
+    return grid_row(latitude) * GRID_COLUMNS + grid_column(longitude)
+
+
+def grid_cell_expression():
+    """Тот же расчёт, что в grid_cell, для генерируемого столбца Place.grid_cell."""
+    return Cast(
+        Floor((F('latitude') + 90) / GRID_CELL_DEGREES) * GRID_COLUMNS
+        + Least(Floor((F('longitude') + 180) / GRID_CELL_DEGREES), GRID_COLUMNS - 1),
+        BigIntegerField()
+    )
+
+
+def grid_column_spans(longitude, delta):
+    """Диапазоны столбцов сетки для [longitude - delta, longitude + delta] с учётом 180-го меридиана."""
+    if delta >= 180:
+        return [(0, GRID_COLUMNS - 1)]
+
+    west, east = longitude - delta, longitude + delta
+    if west < -180:
+        return [(grid_column(west + 360), GRID_COLUMNS - 1), (0, grid_column(east))]
+    if east > 180:
+        return [(grid_column(west), GRID_COLUMNS - 1), (0, grid_column(east - 360))]
+    return [(grid_column(west), grid_column(east))]
+
+
+def grid_cell_ranges(latitude, longitude, radius):
+    """
+    Диапазоны номеров ячеек, покрывающих круг радиуса radius км. В пределах
+    строки сетки номера ячеек идут подряд, поэтому строка даёт один диапазон
+    (два при переходе через 180-й меридиан), который проверяется по индексу.
+    """
+    angle = radius / EARTH_RADIUS_KM
+    delta_latitude = degrees(angle)
+    south, north = latitude - delta_latitude, latitude + delta_latitude
+
+    if south <= -90 or north >= 90:
+        # Круг накрывает полюс: нужны все долготы
+        spans = grid_column_spans(longitude, 180)
+    else:
+        spans = grid_column_spans(longitude, degrees(asin(min(sin(angle) / cos(radians(latitude)), 1))))
+
+    return [
+        (row * GRID_COLUMNS + first, row * GRID_COLUMNS + last)
+        for row in range(grid_row(max(south, -90)), grid_row(min(north, 90)) + 1)
+        for first, last in spans
+    ]
+
+
+def grid_lookup(latitude, longitude, radius):
+    lookup = Q()
+    for first, last in grid_cell_ranges(latitude, longitude, radius):
+        lookup |= Q(grid_cell__range=(first, last))
+    return lookup
+
+
+def distance_expression(latitude, longitude):
+    """Расстояние в километрах от точки до объекта по формуле гаверсинусов."""
+    half_delta_latitude = (Radians('latitude') - radians(latitude)) / 2
+    half_delta_longitude = (Radians('longitude') - radians(longitude)) / 2
+    haversine = (
+        Power(Sin(half_delta_latitude), 2)
+        + cos(radians(latitude)) * Cos(Radians('latitude')) * Power(Sin(half_delta_longitude), 2)
+    )
+    # Из-за округления подкоренное выражение может немного превысить 1
+    return 2 * EARTH_RADIUS_KM * ASin(Least(Sqrt(haversine), 1.0, output_field=FloatField()))
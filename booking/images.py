@@ -0,0 +1,80 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import invalidate_place
+from .models import Place
+
+
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def variant_name(name, width, extension):
+    base, _ = os.path.splitext(name)
+    return f'{base}_{width}w.{extension}'
+
+
+def render_variant(image, width, image_format, options):
+    variant = image.copy()
+    # Ширина не увеличивается: маленький оригинал только пережимается в нужный формат
+    variant.thumbnail((min(width, image.width), image.height), Image.LANCZOS)
+    if image_format == 'JPEG' and variant.mode not in ('RGB', 'L'):
+        variant = variant.convert('RGB')
+
+    buffer = BytesIO()
+    variant.save(buffer, image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def delete_image_files(name):
+    """Удаляет оригинал изображения и все его варианты, если они есть в хранилище."""
+    paths = [name] + [
+        variant_name(name, width, extension) for extension in VARIANT_FORMATS for width in VARIANT_WIDTHS
+    ]
+    for path in paths:
+        if default_storage.exists(path):
+            default_storage.delete(path)
+
+
+def build_image_variants(place_id):
+    """
+    Создаёт уменьшенные копии изображения объекта рядом с оригиналом и
+    сохраняет их имена в Place.image_variants. Если изображение успели
+    заменить, результат не записывается: его перезапишет задача нового файла.
+    """
+    place = Place.objects.filter(pk=place_id).first()
+    if place is None or not place.image:
+        return {}
+
+    name = place.image.name
+    with default_storage.open(name, 'rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+
+    variants = {}
+    for extension, (image_format, options) in VARIANT_FORMATS.items():
+        variants[extension] = {}
+        for width in VARIANT_WIDTHS:
+            path = variant_name(name, width, extension)
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            variants[extension][str(width)] = default_storage.save(
+                path, render_variant(image, width, image_format, options)
+            )
+
+    updated = Place.objects.filter(pk=place_id, image=name).update(
+        image_variants=variants,
+        updated_at=timezone.now()
+    )
+    if updated:
+        # update() минует post_save, а варианты входят в ответ PlaceSerializer
+        invalidate_place(place_id)
+    return variants
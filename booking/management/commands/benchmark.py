@@ -0,0 +1,76 @@
+import json
+import platform
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from booking.benchmarks import SCENARIOS, run_benchmarks
+from booking.models import Booking, Place
+
+
+BENCHMARK_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'},
+}
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время, число SQL-запросов и затронутых строк для горячих сценариев API и задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                            help='Сценарий (можно указать несколько раз); по умолчанию все')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество прогонов каждого сценария')
+        parser.add_argument('--warm', action='store_true', help='Не очищать кэш между прогонами')
+        parser.add_argument('--output', type=Path, help='Записать результаты в JSON-файл')
+        parser.add_argument('--compare', type=Path, help='JSON-файл предыдущего запуска для сравнения')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat должен быть не меньше 1')
+
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(options['compare'].read_text())['results']
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f'Не удалось прочитать {options["compare"]}: {exc}')
+
+        # Отдельный локальный кэш: замеры не трогают рабочий Redis
+        with override_settings(CACHES=BENCHMARK_CACHES, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            try:
+                results = run_benchmarks(options['scenario'], options['repeat'], options['warm'])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'warm': options['warm'],
+            'data': {
+                'places': Place.objects.count(),
+                'bookings': Booking.objects.count(),
+            },
+            'results': results,
+        }
+
+        if options['output']:
+            options['output'].write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+        self.stdout.write(f"{'сценарий':<24}{'median, мс':>12}{'БД, мс':>10}{'запросов':>10}{'строк':>10}")
+        for name, result in results.items():
+            line = (
+                f"{name:<24}{result['wall_ms']['median']:>12.2f}{result['db_ms']:>10.2f}"
+                f"{result['queries']:>10}{result['rows']:>10}"
+            )
+            if baseline and name in baseline:
+                before = baseline[name]
+                change = (result['wall_ms']['median'] / before['wall_ms']['median'] - 1) * 100 \
+                    if before['wall_ms']['median'] else 0
+                line += f"  ({change:+.1f}% времени, {result['queries'] - before['queries']:+d} запросов)"
+            self.stdout.write(line)
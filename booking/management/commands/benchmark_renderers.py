@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.benchmarks import run_renderer_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает время сериализации и рендеринга списка броней в JSON, orjson и MessagePack'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000, help='Количество броней в списке')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество прогонов каждого рендерера')
+        parser.add_argument('--output', type=Path, help='Записать результаты в JSON-файл')
+
+    def handle(self, *args, **options):
+        if options['count'] < 1 or options['repeat'] < 1:
+            raise CommandError('--count и --repeat должны быть не меньше 1')
+
+        results = run_renderer_benchmarks(options['count'], options['repeat'])
+
+        if options['output']:
+            options['output'].write_text(json.dumps({
+                'count': options['count'],
+                'repeat': options['repeat'],
+                'results': results,
+            }, indent=2, ensure_ascii=False))
+
+        baseline = results['json']
+        self.stdout.write(
+            f"{'рендерер':<12}{'сериализация, мс':>18}{'рендеринг, мс':>16}{'всего, мс':>12}{'байт':>12}"
+        )
+        for name, result in results.items():
+            line = (
+                f"{name:<12}{result['serialize_ms']:>18.2f}{result['render_ms']:>16.2f}"
+                f"{result['total_ms']:>12.2f}{result['bytes']:>12}"
+            )
+            if name != 'json' and result['render_ms']:
+                line += (
+                    f"  (рендеринг x{baseline['render_ms'] / result['render_ms']:.1f}, "
+                    f"всего {(result['total_ms'] / baseline['total_ms'] - 1) * 100:+.1f}%)"
+                )
+            self.stdout.write(line)
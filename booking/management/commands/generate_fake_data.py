@@ -0,0 +1,163 @@
+import random
+from collections import Counter
+from datetime import time, timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from booking.models import Booking, BookingStatus, Place, PlaceCategory, SlotOccupancy
+from booking.occupancy import get_covered_slots
+from booking.utils import get_time_slots
+
+
+BATCH_SIZE = 5000
+# Популярность часов: пики утром и вечером после работы
+HOUR_WEIGHTS = {6: 2, 7: 5, 8: 6, 9: 4, 10: 3, 11: 3, 12: 4, 13: 4, 14: 3, 15: 3, 16: 4,
+                17: 7, 18: 10, 19: 10, 20: 8, 21: 5, 22: 2}
+
+
+class Command(BaseCommand):
+    help = 'Генерирует синтетические объекты, пользователей и брони для нагрузочных замеров'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--places', type=int, default=100, help='Количество объектов')
+        parser.add_argument('--users', type=int, default=1000, help='Количество пользователей')
+        parser.add_argument('--bookings', type=int, default=50000, help='Количество броней')
+        parser.add_argument('--days', type=int, default=180, help='Глубина истории в днях')
+        parser.add_argument('--future-days', type=int, default=30, help='Горизонт будущих броней в днях')
+        parser.add_argument('--seed', type=int, default=None, help='Зерно генератора для повторяемых наборов')
+
+    def handle(self, *args, **options):
+        if min(options['places'], options['users']) < 1 or options['bookings'] < 0:
+            raise CommandError('Нужен хотя бы один объект и один пользователь')
+
+        rng = random.Random(options['seed'])
+        prefix = f"fake{rng.randrange(16 ** 6):06x}"
+
+        with transaction.atomic():
+            users = self.create_users(rng, prefix, options['users'])
+            places = self.create_places(rng, prefix, options['places'])
+            created, occupancy = self.create_bookings(
+                rng, users, places, options['bookings'], options['days'], options['future_days']
+            )
+            SlotOccupancy.objects.bulk_create(
+                [
+                    SlotOccupancy(place_id=place_id, date=day, slot_start=slot_start, used=used)
+                    for (place_id, day, slot_start), used in occupancy.items()
+                ],
+                batch_size=BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['place', 'date', 'slot_start'],
+                update_fields=['used']
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано: объектов {len(places)}, пользователей {len(users)}, броней {created} (префикс {prefix})."
+        ))
+
+    def create_users(self, rng, prefix, count):
+        # Хэш пароля считается один раз: PBKDF2 на каждого пользователя занял бы минуты
+        password = make_password('benchmark')
+        User = get_user_model()
+        User.objects.bulk_create(
+            [
+                User(username=f'{prefix}_user{i}', email=f'{prefix}_user{i}@example.com', password=password)
+                for i in range(count)
+            ],
+            batch_size=BATCH_SIZE
+        )
+        return list(User.objects.filter(username__startswith=f'{prefix}_').values_list('pk', flat=True))
+
+    def create_places(self, rng, prefix, count):
+        Place.objects.bulk_create(
+            [
+                Place(
+                    name=f'{prefix} place {i}',
+                    bio='',
+                    location='',
+                    category=rng.choice(PlaceCategory.values),
+                    open_time=time(rng.choice([6, 7, 8, 9, 10])),
+                    close_time=time(rng.choice([18, 20, 21, 22, 23])),
+                    slot_duration=rng.choices([30, 60, 90], weights=[2, 7, 1])[0],
+                    # Большинство залов небольшие, единицы - крупные
+                    capacity=min(1 + int(rng.expovariate(1 / 4)), 50),
+                    # Объекты в пределах города размером около 40 x 40 км
+                    latitude=round(rng.uniform(55.57, 55.93), 6),
+                    longitude=round(rng.uniform(37.35, 37.95), 6)
+                )
+                for i in range(count)
+            ],
+            batch_size=BATCH_SIZE
+        )
+        return list(Place.objects.filter(name__startswith=f'{prefix} '))
+
+    def create_bookings(self, rng, users, places, count, days, future_days):
+        """
+        Брони распределяются по объектам по закону Ципфа, по часам - по HOUR_WEIGHTS.
+        Прошедшие брони в основном завершены, будущие - активны. Вместимость слотов
+        соблюдается; занятость активных броней возвращается для SlotOccupancy.
+        """
+        today = timezone.localdate()
+        place_weights = list(accumulate(1 / rank for rank in range(1, len(places) + 1)))
+        grids = {}
+        used = Counter()
+        occupancy = Counter()
+
+        batch = []
+        created = 0
+        for _ in range(count * 2):
+            if created + len(batch) >= count:
+                break
+
+            place = rng.choices(places, cum_weights=place_weights)[0]
+            day = today + timedelta(days=rng.randint(-days, future_days))
+            if place.pk not in grids:
+                slots = get_time_slots(place, day)
+                grids[place.pk] = slots, list(accumulate(HOUR_WEIGHTS.get(start.hour, 1) for start, _ in slots))
+            slots, slot_weights = grids[place.pk]
+            if not slots:
+                continue
+
+            start_time, end_time = rng.choices(slots, cum_weights=slot_weights)[0]
+            covered = get_covered_slots(place, day, start_time, end_time)
+            if any(used[place.pk, day, slot_start] >= place.capacity for slot_start in covered):
+                continue
+
+            status = self.pick_status(rng, day, today)
+            if status != BookingStatus.CANCELLED:
+                for slot_start in covered:
+                    used[place.pk, day, slot_start] += 1
+                    if status in Booking.get_active_statuses():
+                        occupancy[place.pk, day, slot_start] += 1
+
+            batch.append(Booking(
+                user_id=rng.choice(users),
+                place=place,
+                date=day,
+                start_time=start_time,
+                end_time=end_time,
+                status=status
+            ))
+            if len(batch) >= BATCH_SIZE:
+                created += self.flush(batch)
+
+        created += self.flush(batch)
+        return created, occupancy
+
+    def pick_status(self, rng, day, today):
+        if day < today:
+            return rng.choices([BookingStatus.COMPLETED, BookingStatus.CANCELLED], weights=[85, 15])[0]
+        return rng.choices(
+            [BookingStatus.PENDING, BookingStatus.CONFIRMED, BookingStatus.CANCELLED], weights=[50, 40, 10]
+        )[0]
+
+    def flush(self, batch):
+        # bulk_create минует Booking.save(): валидация и SlotOccupancy обеспечиваются генератором
+        Booking.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+        count = len(batch)
+        batch.clear()
+        return count
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from booking.cache import AVAILABILITY_TIMEOUT, available_times_key, get_cache_stats
+from booking.models import Place
+from booking.occupancy import build_available_times
+
+
+class Command(BaseCommand):
+    help = 'Прогревает кэш available-times на ближайшие дни для самых загруженных объектов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Количество дней начиная с сегодняшнего')
+        parser.add_argument('--places', type=int, default=50, help='Количество самых загруженных объектов')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        dates = [today + timedelta(days=offset) for offset in range(options['days'])]
+
+        places = Place.objects.annotate(
+            recent_bookings=Count('booking', filter=Q(booking__date__gte=today - timedelta(days=30)))
+        ).order_by('-recent_bookings', 'id')[:options['places']]
+
+        warmed = 0
+        for place in places:
+            for date in dates:
+                cache.set(
+                    available_times_key(place.pk, date),
+                    build_available_times(place, date),
+                    AVAILABILITY_TIMEOUT
+                )
+                warmed += 1
+
+        stats = get_cache_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Прогрето {warmed} ответов. Попаданий: {stats['hits']}, промахов: {stats['misses']}."
+        ))
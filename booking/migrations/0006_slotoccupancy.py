@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_place_managers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slot_start', models.TimeField()),
+                ('used', models.PositiveIntegerField(default=0)),
+                ('place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_occupancies', to='booking.place')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('place', 'date', 'slot_start'), name='unique_slot_occupancy')],
+            },
+        ),
+    ]
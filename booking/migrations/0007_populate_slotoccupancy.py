@@ -0,0 +1,60 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import migrations
+
+
+# Сетка слотов и подсчёт пересечений зафиксированы здесь, чтобы миграция
+# не зависела от дальнейших изменений booking.utils и booking.occupancy
+def get_time_slots(place, date):
+    current = datetime.combine(date, place.open_time)
+    end = datetime.combine(date, place.close_time)
+    delta = timedelta(minutes=place.slot_duration)
+
+    slots = []
+    while current + delta <= end:
+        slots.append((current.time(), (current + delta).time()))
+        current += delta
+    return slots
+
+
+def count_overlaps(slots, intervals):
+    return [
+        sum(1 for start, end in intervals if start < slot_end and end > slot_start)
+        for slot_start, slot_end in slots
+    ]
+
+
+def populate_slot_occupancy(apps, schema_editor):
+    Booking = apps.get_model('booking', 'Booking')
+    Place = apps.get_model('booking', 'Place')
+    SlotOccupancy = apps.get_model('booking', 'SlotOccupancy')
+
+    intervals = defaultdict(list)
+    bookings = Booking.objects.filter(
+        status__in=['pending', 'confirmed']
+    ).values_list('place_id', 'date', 'start_time', 'end_time')
+    for place_id, date, start_time, end_time in bookings.iterator():
+        intervals[place_id, date].append((start_time, end_time))
+
+    places = Place.objects.in_bulk({place_id for place_id, _ in intervals})
+    rows = []
+    for (place_id, date), place_intervals in intervals.items():
+        place = places[place_id]
+        slots = get_time_slots(place, date)
+        for (slot_start, _), used in zip(slots, count_overlaps(slots, place_intervals)):
+            if used:
+                rows.append(SlotOccupancy(place_id=place_id, date=date, slot_start=slot_start, used=used))
+
+    SlotOccupancy.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_slotoccupancy'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_slot_occupancy, migrations.RunPython.noop),
+    ]
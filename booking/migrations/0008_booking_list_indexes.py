@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_populate_slotoccupancy'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='booking',
+            options={'ordering': ['-date', 'start_time', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['-date', 'start_time', 'id'], name='booking_list_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', '-date', 'start_time', 'id'], name='booking_user_order_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0010_booking_active_expiry_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=['place', 'date', 'start_time', 'end_time'], name='booking_active_overlap_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['open_time', 'close_time'], name='place_hours_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0012_place_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+TRIGRAM_INDEX_SQL = 'CREATE INDEX IF NOT EXISTS place_name_trgm_idx ON booking_place USING gin (name gin_trgm_ops)'
+
+
+def create_trigram_index(apps, schema_editor):
+    # Без pg_trgm (например, сборка PostgreSQL без contrib) поиск обходится полнотекстовым индексом
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        cursor.execute(TRIGRAM_INDEX_SQL)
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DROP INDEX IF EXISTS place_name_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0013_place_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='place',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('name', config='russian', weight='A'), '||', django.contrib.postgres.search.SearchVector('location', config='russian', weight='B'), django.contrib.postgres.search.SearchConfig('russian')), '||', django.contrib.postgres.search.SearchVector('bio', config='russian', weight='C'), django.contrib.postgres.search.SearchConfig('russian')), name='place_search_idx'),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
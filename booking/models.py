@@ -1,7 +1,13 @@
-from django.core.exceptions import ValidationError
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.conf import settings
 
+from .geo import distance_expression, grid_cell_expression, grid_lookup
+from .search import search_query, search_rank, search_vector, trigram_available
+
 
 class PlaceCategory(models.TextChoices):
     GYM = 'gym', 'Тренажерный зал'
@@ -12,11 +18,76 @@ class PlaceCategory(models.TextChoices):
     OTHER = 'other', 'Другое'
 
 
+class PlaceQuerySet(models.QuerySet):
+    def available_at(self, date, time):
+        """
+        Объекты, открытые в указанное время и имеющие свободные места.
+        Занятость считается коррелированным подзапросом в том же SQL-запросе.
+        """
+        overlapping = Booking.objects.filter(
+            place=OuterRef('pk'),
+            date=date,
+            start_time__lte=time,
+            end_time__gt=time,
+            status__in=Booking.get_active_statuses()
+        ).order_by().values('place').annotate(count=Count('pk')).values('count')
+
+        return self.filter(
+            open_time__lte=time,
+            close_time__gt=time
+        ).annotate(
+            current_bookings=Coalesce(Subquery(overlapping), 0)
+        ).filter(current_bookings__lt=F('capacity'))
+
+    def nearby(self, latitude, longitude, radius):
+        """
+        Объекты в радиусе radius км с аннотацией distance. Кандидаты сначала
+        отбираются по индексу ячеек сетки, затем точно по формуле гаверсинусов.
+        """
+        return self.filter(grid_lookup(latitude, longitude, radius)).annotate(
+            distance=distance_expression(latitude, longitude)
+        ).filter(distance__lte=radius)
+
+    def search(self, text):
+        """
+        Объекты, подходящие под запрос: совпадение по префиксам слов в названии,
+        адресе и описании, а при наличии pg_trgm ещё и похожее название с опечатками.
+        """
+        lookup = Q(document=search_query(text))
+        if trigram_available(self.db):
+            lookup |= Q(name__trigram_word_similar=text)
+        return self.alias(document=search_vector()).filter(lookup)
+
+    def ranked(self, text):
+        return self.annotate(rank=search_rank(text, self.db)).order_by('-rank', 'id')
+
+    def category_facets(self):
+        """Число объектов по каждой категории одним агрегатным запросом."""
+        return self.order_by().aggregate(**{
+            category: Count('pk', filter=Q(category=category))
+            for category in PlaceCategory.values
+        })
+
+
 class Place(models.Model):
     name = models.CharField(max_length=255)
     bio = models.TextField()
     location = models.CharField(max_length=255)
+    latitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    # Номер ячейки сетки по координатам, считается самой БД
+    grid_cell = models.GeneratedField(
+        expression=grid_cell_expression(),
+        output_field=models.BigIntegerField(),
+        db_persist=True
+    )
     image = models.ImageField(upload_to='places/', null=True, blank=True)
+    # Уменьшенные копии image: {формат: {ширина: имя файла}}, заполняются фоновой задачей
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     open_time = models.TimeField()
     close_time = models.TimeField()
     slot_duration = models.PositiveIntegerField(help_text='Slot duration in minutes', default=60)
@@ -31,6 +102,20 @@ class Place(models.Model):
         related_name='managed_places',
         blank=True
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PlaceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Фильтр по рабочему времени в available_at
+            models.Index(fields=['open_time', 'close_time'], name='place_hours_idx'),
+            # Полнотекстовый поиск в PlaceQuerySet.search; триграммный индекс по name
+            # создаётся миграцией, только если доступно расширение pg_trgm
+            GinIndex(search_vector(), name='place_search_idx'),
+            # Отбор кандидатов по ячейкам сетки в PlaceQuerySet.nearby
+            models.Index(fields=['grid_cell'], name='place_grid_cell_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_category_display()})"
@@ -50,6 +135,8 @@ class Booking(models.Model):
     start_time = models.TimeField()
     end_time = models.TimeField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Водяной знак инкрементального пересчёта PlaceDailyStats
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     status = models.CharField(
         max_length=20,
@@ -57,6 +144,11 @@ class Booking(models.Model):
         default=BookingStatus.PENDING
     )
 
+    # Ключ слотов, занятых бронью в SlotOccupancy на момент загрузки из БД
+    occupied_key = None
+    # Снимок занятости, уже прочитанный при валидации в этом запросе
+    occupancy_context = None
+
     @classmethod
     def get_active_statuses(cls):
         return [BookingStatus.PENDING, BookingStatus.CONFIRMED]
@@ -66,35 +158,128 @@ class Booking(models.Model):
         return [BookingStatus.CANCELLED, BookingStatus.COMPLETED]
 
     class Meta:
-        ordering = ['-date', 'start_time']
+        ordering = ['-date', 'start_time', 'id']
+        indexes = [
+            # Порядок списка броней и курсорной пагинации
+            models.Index(fields=['-date', 'start_time', 'id'], name='booking_list_order_idx'),
+            models.Index(fields=['user', '-date', 'start_time', 'id'], name='booking_user_order_idx'),
+            # Проверки пересечений: только активные брони, времена доступны без чтения таблицы
+            models.Index(
+                fields=['place', 'date', 'start_time', 'end_time'],
+                name='booking_active_overlap_idx',
+                condition=models.Q(status__in=['pending', 'confirmed'])
+            ),
+            # Поиск прошедших активных броней для auto_complete_bookings
+            models.Index(
+                fields=['date', 'end_time'],
+                name='booking_active_expiry_idx',
+                condition=models.Q(status__in=['pending', 'confirmed'])
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.place.name} | {self.date} | ({self.start_time}-{self.end_time})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.occupied_key = instance.get_occupancy_key()
+        return instance
+
+    def get_occupancy_key(self):
+        """Слоты, которые бронь занимает в SlotOccupancy, или None для закрытых броней."""
+        if self.status not in Booking.get_active_statuses():
+            return None
+        return self.place_id, self.date, self.start_time, self.end_time
+
     def clean(self):
+        from .validation import validate_booking
+
         if self.status in Booking.get_closed_statuses():
             return
 
-        if self.start_time < self.place.open_time or self.end_time > self.place.close_time:
-            raise ValidationError("Время бронирования вне рабочего времени объекта.")
+        validate_booking(
+            self.place,
+            self.date,
+            self.start_time,
+            self.end_time,
+            status=self.status,
+            booking=self,
+            context=self.occupancy_context
+        )
 
-        if self.start_time >= self.end_time:
-            raise ValidationError("Время начала должно быть раньше окончания.")
+    def save(self, *args, **kwargs):
+        from .occupancy import release_slots, reserve_slots
 
-        overlapping = Booking.objects.filter(
-            place=self.place,
-            date=self.date,
-            start_time__lt=self.end_time,
-            end_time__gt=self.start_time,
-        )
-        if self.pk:
-            overlapping = overlapping.exclude(pk=self.pk)
+        # Смена только статуса (отмена, подтверждение, завершение) не меняет слоты брони,
+        # поэтому повторная валидация нужна лишь при возврате закрытой брони в активную
+        update_fields = kwargs.get('update_fields')
+        status_only = update_fields is not None and set(update_fields) == {'status'}
+        if not status_only or self.get_occupancy_key() not in (None, self.occupied_key):
+            self.full_clean()
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
 
-        count = overlapping.count()
+        current_key = self.get_occupancy_key()
+        with transaction.atomic():
+            if current_key != self.occupied_key:
+                if self.occupied_key is not None:
+                    place_id, date, start_time, end_time = self.occupied_key
+                    place = self.place if place_id == self.place_id else Place.objects.get(pk=place_id)
+                    release_slots(place, date, start_time, end_time)
+                if current_key is not None:
+                    reserve_slots(self.place, self.date, self.start_time, self.end_time)
+            super().save(*args, **kwargs)
+        self.occupied_key = current_key
 
-        if count >= self.place.capacity:
-            raise ValidationError("В это время уже забронировано максимальное количество человек.")
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+class SlotOccupancy(models.Model):
+    place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='slot_occupancies')
+    date = models.DateField()
+    slot_start = models.TimeField()
+    used = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['place', 'date', 'slot_start'], name='unique_slot_occupancy'),
+        ]
+
+    def __str__(self):
+        return f"{self.place_id} | {self.date} {self.slot_start} | {self.used}"
+
+
+class PlaceDailyStats(models.Model):
+    """
+    Дневная сводка по объекту для аналитики менеджеров. Поддерживается задачей
+    booking.tasks.rollup_place_daily_stats; stale помечает строки, которые нужно
+    пересчитать независимо от водяного знака (удалённые и перенесённые брони).
+    """
+    place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    bookings = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    cancelled = models.PositiveIntegerField(default=0)
+    booked_slots = models.PositiveIntegerField(default=0)
+    capacity_slots = models.PositiveIntegerField(default=0)
+    stale = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['place', 'date'], name='unique_place_daily_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['stale'], name='place_daily_stats_stale_idx', condition=models.Q(stale=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.place_id} | {self.date} | {self.bookings}"
+
+
+class RollupWatermark(models.Model):
+    """Момент, до которого изменения броней уже учтены в сводке."""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
@@ -0,0 +1,229 @@
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+
+from .models import Booking, SlotOccupancy
+from .utils import get_time_slots
+
+
+CAPACITY_ERROR = "Максимальное количество бронирований на это время уже достигнуто."
+
+
+def count_overlaps(slots, intervals):
+    """
+    Считает для каждого слота количество интервалов, пересекающихся с ним.
+    Интервал (s, e) пересекает слот (a, b), если s < b и e > a, поэтому
+    результат = #(s < b) - #(e <= a) по отсортированным началам и концам.
+    """
+    starts = sorted(start for start, _ in intervals)
+    ends = sorted(end for _, end in intervals)
+
+    return [
+        bisect_left(starts, slot_end) - bisect_right(ends, slot_start)
+        for slot_start, slot_end in slots
+    ]
+
+
+def get_covered_slots(place, date, start_time, end_time):
+    """Начала слотов сетки объекта, которые пересекает интервал брони."""
+    return [
+        slot_start
+        for slot_start, slot_end in get_time_slots(place, date)
+        if slot_start < end_time and slot_end > start_time
+    ]
+
+
+def serialize_slots(place, date, used):
+    return [
+        {
+            'start_time': start_time.strftime('%H:%M'),
+            'end_time': end_time.strftime('%H:%M'),
+            'availabe': used.get(start_time, 0) < place.capacity,
+            'current_bookings': used.get(start_time, 0),
+            'max_capacity': place.capacity
+        }
+        for start_time, end_time in get_time_slots(place, date)
+    ]
+
+
+def build_available_times(place, date):
+    """Ответ available-times: список слотов с текущей занятостью."""
+    used = dict(
+        SlotOccupancy.objects.filter(place=place, date=date).values_list('slot_start', 'used')
+    )
+    return serialize_slots(place, date, used)
+
+
+def build_calendar(places, dates):
+    """
+    Сетка слотов для нескольких объектов и дат. Занятость всех пар (объект, дата)
+    читается одним запросом и группируется в памяти.
+    """
+    used = defaultdict(dict)
+    rows = SlotOccupancy.objects.filter(
+        place__in=places,
+        date__gte=min(dates),
+        date__lte=max(dates)
+    ).values_list('place_id', 'date', 'slot_start', 'used')
+    for place_id, date, slot_start, count in rows:
+        used[place_id, date][slot_start] = count
+
+    return [
+        {
+            'place': place.pk,
+            'days': [
+                {'date': date.isoformat(), 'slots': serialize_slots(place, date, used[place.pk, date])}
+                for date in dates
+            ]
+        }
+        for place in places
+    ]
+
+
+class OccupancyContext:
+    """
+    Снимок занятости слотов. Строки SlotOccupancy каждой пары (объект, дата)
+    читаются не более одного раза, поэтому повторные проверки в рамках одного
+    запроса (сериализатор, затем модель) не обращаются к базе.
+    """
+
+    def __init__(self, rows=()):
+        self._used = defaultdict(dict)
+        self._loaded = set()
+        for row in rows:
+            self._used[row.place_id, row.date][row.slot_start] = row.used
+            self._loaded.add((row.place_id, row.date))
+
+    def get_used(self, place, date):
+        key = (place.pk, date)
+        if key not in self._loaded:
+            self._used[key] = dict(
+                SlotOccupancy.objects.filter(place=place, date=date).values_list('slot_start', 'used')
+            )
+            self._loaded.add(key)
+        return self._used[key]
+
+    def has_capacity(self, place, date, start_time, end_time, booking=None):
+        """
+        Проверяет, что во всех слотах интервала есть свободные места.
+        Если booking уже занимает эти слоты, его собственное место не учитывается.
+        """
+        slot_starts = get_covered_slots(place, date, start_time, end_time)
+        if not slot_starts:
+            return True
+
+        own_slots = set()
+        if booking is not None and booking.occupied_key is not None:
+            place_id, own_date, own_start, own_end = booking.occupied_key
+            if place_id == place.pk and own_date == date:
+                own_slots = set(get_covered_slots(place, date, own_start, own_end))
+
+        used = self.get_used(place, date)
+        return all(
+            used.get(slot_start, 0) - (slot_start in own_slots) < place.capacity
+            for slot_start in slot_starts
+        )
+
+    def occupy(self, place, date, start_time, end_time):
+        """Учитывает бронь в снимке; возвращает начала занятых слотов."""
+        used = self.get_used(place, date)
+        slot_starts = get_covered_slots(place, date, start_time, end_time)
+        for slot_start in slot_starts:
+            used[slot_start] = used.get(slot_start, 0) + 1
+        return slot_starts
+
+
+def reserve_slots(place, date, start_time, end_time):
+    """
+    Занимает место во всех слотах интервала условным UPDATE ... WHERE used < capacity.
+    Блокировка строк делает проверку и запись атомарными для параллельных запросов.
+    """
+    slot_starts = get_covered_slots(place, date, start_time, end_time)
+    if not slot_starts:
+        return
+
+    with transaction.atomic():
+        SlotOccupancy.objects.bulk_create(
+            [SlotOccupancy(place=place, date=date, slot_start=slot_start) for slot_start in slot_starts],
+            ignore_conflicts=True
+        )
+        updated = SlotOccupancy.objects.filter(
+            place=place,
+            date=date,
+            slot_start__in=slot_starts,
+            used__lt=place.capacity
+        ).update(used=F('used') + 1)
+
+        if updated < len(slot_starts):
+            raise ValidationError(CAPACITY_ERROR)
+
+
+def release_slots(place, date, start_time, end_time):
+    slot_starts = get_covered_slots(place, date, start_time, end_time)
+    if not slot_starts:
+        return
+
+    SlotOccupancy.objects.filter(
+        place=place,
+        date=date,
+        slot_start__in=slot_starts,
+        used__gt=0
+    ).update(used=F('used') - 1)
+
+
+def release_many(intervals):
+    """
+    Освобождает слоты пачки броней одним UPDATE на пару (place, date).
+    intervals - кортежи (place, date, start_time, end_time).
+    """
+    released = defaultdict(Counter)
+    places = {}
+    for place, date, start_time, end_time in intervals:
+        places[place.pk] = place
+        released[place.pk, date].update(get_covered_slots(place, date, start_time, end_time))
+
+    for (place_id, date), counts in released.items():
+        if not counts:
+            continue
+        SlotOccupancy.objects.filter(
+            place_id=place_id,
+            date=date,
+            slot_start__in=counts
+        ).update(used=Greatest(
+            F('used') - Case(*[When(slot_start=slot_start, then=Value(count)) for slot_start, count in counts.items()]),
+            0
+        ))
+
+
+def rebuild_occupancy(place, dates):
+    """
+    Пересчитывает SlotOccupancy объекта на указанные даты по активным броням.
+    Используется после изменения сетки слотов и массовых обновлений статуса.
+    """
+    dates = set(dates)
+    if not dates:
+        return
+
+    intervals = defaultdict(list)
+    bookings = Booking.objects.filter(
+        place=place,
+        date__in=dates,
+        status__in=Booking.get_active_statuses()
+    ).values_list('date', 'start_time', 'end_time')
+    for date, start_time, end_time in bookings:
+        intervals[date].append((start_time, end_time))
+
+    rows = []
+    for date in dates:
+        slots = get_time_slots(place, date)
+        for (slot_start, _), used in zip(slots, count_overlaps(slots, intervals[date])):
+            if used:
+                rows.append(SlotOccupancy(place=place, date=date, slot_start=slot_start, used=used))
+
+    with transaction.atomic():
+        SlotOccupancy.objects.filter(place=place, date__in=dates).delete()
+        SlotOccupancy.objects.bulk_create(rows)
@@ -0,0 +1,50 @@
+from functools import partial
+
+from django.core.paginator import Paginator
+from rest_framework.pagination import PageNumberPagination
+
+from bronkz.pagination import KeysetPagination
+
+
+class CountedPaginator(Paginator):
+    """Paginator с заранее известным числом объектов: отдельный COUNT не выполняется."""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+
+
+class AvailablePlacePagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_count(self, request, count, view=None):
+        """
+        Выбирает страницу по уже известному числу объектов, не читая сами объекты:
+        строки страницы берутся из кэша, а ссылки next/previous строятся по текущему запросу.
+        """
+        self.django_paginator_class = partial(CountedPaginator, count=count)
+        return super().paginate_queryset([], request, view)
+
+
+class PlaceSearchPagination(AvailablePlacePagination):
+    def paginate_queryset(self, queryset, request, view=None, count=None):
+        """count передаётся, если число результатов уже посчитано (фасеты поиска)."""
+        self.django_paginator_class = Paginator if count is None else partial(CountedPaginator, count=count)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['facets'] = {
+            'type': 'object',
+            'additionalProperties': {'type': 'integer'},
+            'example': {'gym': 3, 'pool': 1},
+        }
+        return response_schema
+
+
+class BookingPagination(KeysetPagination):
+    page_size = 50
+    max_page_size = 100
+    ordering = ('-date', 'start_time', 'id')
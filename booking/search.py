@@ -0,0 +1,62 @@
+import re
+from functools import lru_cache
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connections
+
+
+SEARCH_CONFIG = 'russian'
+SEARCH_MAX_TERMS = 8
+TRIGRAM_EXTENSION = 'pg_trgm'
+
+
+def search_vector():
+    """
+    Документ для полнотекстового поиска по объекту. Выражение совпадает
+    с выражением индекса place_search_idx, иначе PostgreSQL его не использует.
+    """
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('location', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('bio', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def search_terms(text):
+    return re.findall(r'\w+', text.lower())[:SEARCH_MAX_TERMS]
+
+
+def search_query(text):
+    """
+    Запрос по префиксам всех слов: «трен зал» -> трен:* & зал:*.
+    Операторы tsquery из пользовательского ввода не пропускаются.
+    """
+    return SearchQuery(
+        ' & '.join(f'{term}:*' for term in search_terms(text)),
+        search_type='raw',
+        config=SEARCH_CONFIG
+    )
+
+
+def search_rank(text, using='default'):
+    rank = SearchRank(search_vector(), search_query(text))
+    if trigram_available(using):
+        rank += TrigramWordSimilarity(text, 'name')
+    return rank
+
+
+@lru_cache
+def trigram_available(using='default'):
+    """
+    Установлено ли расширение pg_trgm. Без него поиск работает только
+    по полнотекстовому индексу, без исправления опечаток.
+
+    Проверяется одним запросом на подключение за время жизни процесса;
+    после migrate результат сбрасывается (см. booking.signals).
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_extension WHERE extname = %s', [TRIGRAM_EXTENSION])
+        return cursor.fetchone() is not None
@@ -1,8 +1,13 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from datetime import datetime, timedelta
 
 from .models import Booking, Place, BookingStatus
-from .utils import get_time_slots
+from .images import VARIANT_FORMATS, VARIANT_WIDTHS
+from .occupancy import OccupancyContext, rebuild_occupancy
+from .validation import validate_booking
 
 
 class BookingSerializer(serializers.ModelSerializer):
@@ -12,51 +17,140 @@ class BookingSerializer(serializers.ModelSerializer):
         read_only_fields = ('user',)
 
     def validate(self, data):
-        place = data['place']
-        start = data['start_time']
-        end = data['end_time']
-        date = data['date']
-
-        if start < place.open_time or end > place.close_time:
-            raise serializers.ValidationError("Время бронирования вне рабочего времени объекта.")
-
-        if start >= end:
-            raise serializers.ValidationError("Время начала должно быть раньше времени окончания")
-
-        duration = datetime.combine(date, end) - datetime.combine(date, start)
-        if duration != timedelta(minutes=place.slot_duration):
-            raise serializers.ValidationError("Продолжительность бронирования должна быть равна продолжительности слота")
-
-        slots = get_time_slots(place, date)
-        if (start, end) not in slots:
-            raise serializers.ValidationError("Выбранное время не соответствует доступным слотам.")
-
-        overlapping = Booking.objects.filter(
-            place=place,
-            date=date,
-            start_time__lt=end,
-            end_time__gt=start,
-        )
+        def get(field):
+            return data[field] if field in data else getattr(self.instance, field)
+
+        # Снимок занятости передаётся модели, чтобы full_clean() не читал его повторно
+        self.occupancy = OccupancyContext()
+        try:
+            validate_booking(
+                get('place'),
+                get('date'),
+                get('start_time'),
+                get('end_time'),
+                status=data.get('status', getattr(self.instance, 'status', BookingStatus.PENDING)),
+                booking=self.instance,
+                context=self.occupancy,
+                strict=True
+            )
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(serializers.as_serializer_error(exc))
 
-        if self.instance:
-            overlapping = overlapping.exclude(id=self.instance.id).filter(status__in=Booking.get_active_statuses())
+        return data
 
-        if overlapping.count() >= place.capacity:
-            raise serializers.ValidationError("Максимальное количество бронирований на это время уже достигнуто.")
+    def create(self, validated_data):
+        return self.save_booking(Booking(**validated_data))
+
+    def update(self, instance, validated_data):
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        return self.save_booking(instance)
+
+    def save_booking(self, booking):
+        booking.occupancy_context = getattr(self, 'occupancy', None)
+        try:
+            booking.save()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(serializers.as_serializer_error(exc))
+        return booking
 
-        return data
 
+class BulkBookingItemSerializer(serializers.Serializer):
+    place = serializers.IntegerField()
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
 
-class PlaceSerializer(serializers.ModelSerializer):
+
+class PlaceListSerializer(serializers.ModelSerializer):
+    """
+    Облегчённое представление для списков: без описания и менеджеров,
+    поэтому страница списка не требует запросов к связанным таблицам.
+    """
     category_display = serializers.CharField(source='get_category_display', read_only=True)
     image = serializers.ImageField(required=False, allow_null=True)
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Place
-        fields = '__all__'
+        fields = [
+            'id', 'name', 'location', 'category', 'category_display', 'image', 'image_srcset',
+            'open_time', 'close_time', 'slot_duration', 'capacity', 'latitude', 'longitude',
+        ]
+
+    def get_image_srcset(self, obj) -> dict | None:
+        """
+        Ссылки на варианты изображения: {формат: {ширина: url}}.
+        Пока вариант не создан, вместо него отдаётся оригинал.
+        """
+        if not obj.image:
+            return None
+
+        request = self.context.get('request')
+
+        def url(name):
+            value = default_storage.url(name)
+            return request.build_absolute_uri(value) if request else value
+
+        srcset = {}
+        for extension in VARIANT_FORMATS:
+            variants = obj.image_variants.get(extension, {})
+            srcset[extension] = {
+                str(width): url(variants.get(str(width), obj.image.name))
+                for width in VARIANT_WIDTHS
+            }
+        return srcset
+
+
+class PlaceSerializer(PlaceListSerializer):
+    class Meta:
+        model = Place
+        # Варианты изображения отдаются через image_srcset
+        exclude = ['grid_cell', 'image_variants']
+
+    def validate(self, data):
+        coordinates = [
+            data.get(field, getattr(self.instance, field, None)) for field in ('latitude', 'longitude')
+        ]
+        if coordinates.count(None) == 1:
+            raise serializers.ValidationError("Широта и долгота задаются вместе.")
+        return data
+
+
+class NearbyPlaceSerializer(PlaceListSerializer):
+    distance = serializers.FloatField(read_only=True, help_text='Расстояние до объекта, км')
+
+    class Meta(PlaceListSerializer.Meta):
+        fields = PlaceListSerializer.Meta.fields + ['distance']
 
 
 class PlaceManagerUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Place
         fields = ['open_time', 'close_time', 'slot_duration', 'capacity']
+
+    def update(self, instance, validated_data):
+        grid_fields = ('open_time', 'close_time', 'slot_duration')
+        grid_changed = any(
+            field in validated_data and validated_data[field] != getattr(instance, field)
+            for field in grid_fields
+        )
+
+        with transaction.atomic():
+            place = super().update(instance, validated_data)
+            if grid_changed:
+                # Сетка слотов изменилась: занятость будущих дат пересчитывается по новой сетке
+                today = timezone.localdate()
+                dates = set(
+                    place.slot_occupancies.filter(date__gte=today).values_list('date', flat=True)
+                )
+                dates.update(
+                    Booking.objects.filter(
+                        place=place,
+                        date__gte=today,
+                        status__in=Booking.get_active_statuses()
+                    ).order_by().values_list('date', flat=True).distinct()
+                )
+                rebuild_occupancy(place, dates)
+
+        return place
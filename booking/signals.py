@@ -1,15 +1,90 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_migrate, post_save, post_delete
+from django.utils import timezone
 from django.dispatch import receiver
 from booking.models import Booking, Place
-from logs.models import ActivityLog
+from booking.occupancy import release_slots
+from booking.cache import invalidate_booking_slots, invalidate_place
+from booking.analytics import mark_stale
+from booking.search import trigram_available
+from logs.activity import log_activity
 
 
 @receiver(post_save, sender=Booking)
 def log_booking_change(sender, instance, created, **kwargs):
 
     if created:
-        ActivityLog.objects.create(
+        log_activity(
             user=instance.user,
             action='Создал бронь',
             content_object=instance
         )
+
+
+@receiver(post_save, sender=Booking)
+def invalidate_booking_availability(sender, instance, created, **kwargs):
+    # occupied_key обновляется после post_save, поэтому здесь он ещё описывает старые слоты
+    previous_key = instance.occupied_key
+    current_key = instance.get_occupancy_key()
+    if not created and previous_key == current_key:
+        return
+
+    for key in {previous_key, current_key} - {None}:
+        place_id, date, _, _ = key
+        transaction.on_commit(lambda place_id=place_id, date=date: invalidate_booking_slots(place_id, date))
+
+
+@receiver(post_save, sender=Booking)
+def mark_moved_booking_stats(sender, instance, created, **kwargs):
+    # Новая пара (place, date) попадёт в сводку по updated_at, старую нужно пометить явно
+    if created or instance.occupied_key is None:
+        return
+
+    place_id, date, _, _ = instance.occupied_key
+    if (place_id, date) != (instance.place_id, instance.date):
+        mark_stale(place_id, date)
+
+
+@receiver(post_delete, sender=Booking)
+def mark_deleted_booking_stats(sender, instance, **kwargs):
+    mark_stale(instance.place_id, instance.date)
+
+
+@receiver(post_delete, sender=Booking)
+def release_booking_slots(sender, instance, **kwargs):
+    if instance.occupied_key is not None:
+        place_id, date, start_time, end_time = instance.occupied_key
+        place = Place.objects.filter(pk=place_id).first()
+        if place is not None:
+            release_slots(place, date, start_time, end_time)
+        transaction.on_commit(lambda: invalidate_booking_slots(place_id, date))
+
+
+@receiver(post_save, sender=Place)
+@receiver(post_delete, sender=Place)
+def invalidate_place_availability(sender, instance, **kwargs):
+    place_id = instance.pk
+    transaction.on_commit(lambda: invalidate_place(place_id))
+
+
+@receiver(m2m_changed, sender=Place.managers.through)
+def touch_place_managers(sender, instance, action, reverse, pk_set, **kwargs):
+    # Менеджеры входят в ответ PlaceSerializer, но их смена не вызывает post_save объекта
+    if not reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        place_ids = [instance.pk]
+    elif reverse and action in ('post_add', 'post_remove'):
+        place_ids = list(pk_set)
+    elif reverse and action == 'pre_clear':
+        place_ids = list(instance.managed_places.values_list('pk', flat=True))
+    else:
+        return
+
+    Place.objects.filter(pk__in=place_ids).update(updated_at=timezone.now())
+    for place_id in place_ids:
+        transaction.on_commit(lambda place_id=place_id: invalidate_place(place_id))
+
+
+@receiver(post_migrate)
+def refresh_trigram_available(sender, **kwargs):
+    # Миграция могла установить pg_trgm после того, как процесс проверил его наличие
+    trigram_available.cache_clear()
@@ -1,23 +1,92 @@
-from datetime import datetime
+import logging
+
 from celery import shared_task
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 
-from .models import Booking, BookingStatus
+from logs.activity import buffered_activity_log, log_activity
+from .models import Booking, BookingStatus, Place
+from .occupancy import release_many
+from .cache import invalidate_booking_slots
+from .analytics import rollup_daily_stats
+from .images import build_image_variants
+
+
+AUTO_COMPLETE_CHUNK_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def expired_bookings_chunk(now):
+    """
+    Очередная пачка активных броней, закончившихся к моменту now, с блокировкой
+    строк. Пропускает строки, уже заблокированные другим воркером.
+    """
+    return Booking.objects.filter(
+        status__in=Booking.get_active_statuses()
+    ).filter(
+        Q(date__lt=now.date()) |
+        Q(date=now.date(), end_time__lte=now.time())
+    ).select_for_update(skip_locked=True).order_by('pk').only(
+        'pk', 'place_id', 'date', 'start_time', 'end_time', 'status'
+    )[:AUTO_COMPLETE_CHUNK_SIZE]
 
 
 @shared_task
 def auto_complete_bookings():
+    """
+    Завершает прошедшие активные брони пачками по первичному ключу.
+    Каждая пачка блокируется SELECT ... FOR UPDATE SKIP LOCKED, поэтому
+    несколько воркеров обрабатывают разные брони и не ждут друг друга.
+    Возвращает фактическое число завершённых броней.
+    """
     now = timezone.localtime()
-    today = now.date()
-    current_time = now.time()
 
-    bookings = Booking.objects.filter(
-        status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED]
-    ).filter(
-        Q(date__lt=today) |
-        Q(date=today, end_time__lte=current_time)
-    )
-    print(f"[Celery] Завершено {bookings.count()} бронирований автоматически.")
-    bookings.update(status=BookingStatus.COMPLETED)
+    completed = 0
+    while True:
+        with buffered_activity_log(), transaction.atomic():
+            bookings = list(expired_bookings_chunk(now))
+            if not bookings:
+                break
+
+            # validate_booking здесь не вызывается: перевод в закрытый статус не занимает
+            # слоты, и для него сервис проверки ничего не проверяет (как при cancel/complete
+            # через API). Рабочее время объекта могло измениться после создания брони,
+            # но завершению прошедшей брони это не мешает.
+            completed += Booking.objects.filter(pk__in=[booking.pk for booking in bookings]).update(
+                status=BookingStatus.COMPLETED,
+                updated_at=timezone.now()
+            )
 
+            # update() минует Booking.save(), поэтому занятые слоты освобождаются отдельно
+            places = Place.objects.in_bulk({booking.place_id for booking in bookings})
+            release_many(
+                (places[booking.place_id], booking.date, booking.start_time, booking.end_time)
+                for booking in bookings
+            )
+
+            for booking in bookings:
+                log_activity(
+                    user=None,
+                    action='Бронь завершена автоматически',
+                    content_object=booking
+                )
+
+            for place_id, date in {(booking.place_id, booking.date) for booking in bookings}:
+                transaction.on_commit(
+                    lambda place_id=place_id, date=date: invalidate_booking_slots(place_id, date)
+                )
+
+    logger.info("Завершено %s бронирований автоматически.", completed)
+    return completed
+
+
+@shared_task
+def rollup_place_daily_stats():
+    return rollup_daily_stats()
+
+
+@shared_task
+def generate_place_image_variants(place_id):
+    return build_image_variants(place_id)
@@ -0,0 +1,123 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking.analytics import rollup_daily_stats
+from booking.models import Booking, BookingStatus, Place, PlaceDailyStats
+
+
+class PlaceDailyStatsRollupTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        # 10 слотов по часу, вместимость 2 -> 20 мест в день
+        self.place = Place.objects.create(name='Зал', open_time=time(8), close_time=time(18), capacity=2)
+        self.date = date(2030, 1, 10)
+
+    def book(self, hour, day=None, status=BookingStatus.PENDING, duration=1):
+        return Booking.objects.create(
+            user=self.user, place=self.place, date=day or self.date,
+            start_time=time(hour), end_time=time(hour + duration), status=status
+        )
+
+    def age_bookings(self):
+        Booking.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+    def stats(self, day=None):
+        return PlaceDailyStats.objects.get(place=self.place, date=day or self.date)
+
+    def test_rollup_counts_bookings_and_slots(self):
+        self.book(9)
+        self.book(10, status=BookingStatus.COMPLETED)
+        self.book(10, status=BookingStatus.CANCELLED)
+
+        self.assertEqual(rollup_daily_stats(), 1)
+
+        stats = self.stats()
+        self.assertEqual(
+            (stats.bookings, stats.completed, stats.cancelled, stats.booked_slots, stats.capacity_slots),
+            (3, 1, 1, 2, 20)
+        )
+
+    def test_only_touched_pairs_are_reprocessed(self):
+        self.book(9)
+        self.book(9, day=self.date + timedelta(days=1))
+        self.age_bookings()
+        rollup_daily_stats()
+
+        self.book(11)
+
+        self.assertEqual(rollup_daily_stats(), 1)
+        self.assertEqual(self.stats().bookings, 2)
+
+    def test_status_change_bumps_watermark(self):
+        booking = self.book(9)
+        self.age_bookings()
+        rollup_daily_stats()
+
+        booking.status = BookingStatus.CANCELLED
+        booking.save(update_fields=['status'])
+        rollup_daily_stats()
+
+        self.assertEqual(self.stats().cancelled, 1)
+
+    def test_deleted_and_moved_bookings_mark_stale(self):
+        deleted = self.book(9)
+        moved = self.book(10)
+        self.age_bookings()
+        rollup_daily_stats()
+
+        deleted.delete()
+        moved = Booking.objects.get(pk=moved.pk)
+        moved.date = self.date + timedelta(days=1)
+        moved.save()
+        self.assertTrue(self.stats().stale)
+
+        rollup_daily_stats()
+
+        self.assertFalse(PlaceDailyStats.objects.filter(place=self.place, date=self.date).exists())
+        self.assertEqual(self.stats(self.date + timedelta(days=1)).bookings, 1)
+
+
+class PlaceAnalyticsViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = get_user_model().objects.create_user(username='manager', password='1234', role='manager')
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.place = Place.objects.create(name='Зал', open_time=time(8), close_time=time(18), capacity=2)
+        self.place.managers.add(self.manager)
+        PlaceDailyStats.objects.create(
+            place=self.place, date=date(2030, 1, 2), bookings=4, completed=2, cancelled=1,
+            booked_slots=3, capacity_slots=20
+        )
+
+    def get_analytics(self, **params):
+        return self.client.get(f'/api/places/{self.place.pk}/analytics/', params)
+
+    def test_year_range_from_rollup(self):
+        self.client.force_authenticate(self.manager)
+
+        # объект, проверка менеджера, сводка
+        with self.assertNumQueries(3):
+            response = self.get_analytics(**{'from': '2030-01-01', 'to': '2030-12-31'})
+
+        data = response.json()
+        self.assertEqual(len(data['days']), 365)
+        self.assertEqual(data['days'][1]['fill_rate'], 0.15)
+        self.assertEqual(data['days'][1]['cancellation_rate'], 0.25)
+        self.assertEqual(data['days'][0]['capacity_slots'], 20)
+        self.assertEqual(data['totals']['bookings'], 4)
+        self.assertEqual(data['totals']['capacity_slots'], 365 * 20)
+
+    def test_only_place_managers(self):
+        self.client.force_authenticate(self.user)
+
+        self.assertEqual(self.get_analytics(**{'from': '2030-01-01', 'to': '2030-01-31'}).status_code, 403)
+
+    def test_invalid_range(self):
+        self.client.force_authenticate(self.manager)
+
+        for params in ({}, {'from': '2030-02-01', 'to': '2030-01-01'}, {'from': '2030-01-01', 'to': '2031-06-01'}):
+            self.assertEqual(self.get_analytics(**params).status_code, 400)
@@ -0,0 +1,72 @@
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from booking.models import Booking, BookingStatus, Place, PlaceCategory
+
+
+class AvailablePlacesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.date = date(2030, 1, 10)
+
+    def create_place(self, name, **kwargs):
+        defaults = dict(name=name, open_time=time(8), close_time=time(20), capacity=1)
+        defaults.update(kwargs)
+        return Place.objects.create(**defaults)
+
+    def book(self, place, status=BookingStatus.PENDING):
+        return Booking.objects.create(
+            user=self.user, place=place, date=self.date,
+            start_time=time(10), end_time=time(11), status=status
+        )
+
+    def get_available(self, **params):
+        params.setdefault('date', self.date.isoformat())
+        params.setdefault('time', '10:30')
+        response = self.client.get('/api/places/available/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_excludes_full_and_closed_places(self):
+        free = self.create_place('free')
+        full = self.create_place('full')
+        cancelled = self.create_place('cancelled')
+        self.create_place('closed', open_time=time(12))
+        self.book(full)
+        self.book(cancelled, status=BookingStatus.CANCELLED)
+
+        data = self.get_available()
+
+        self.assertEqual(data['count'], 2)
+        self.assertEqual([p['id'] for p in data['results']], [free.pk, cancelled.pk])
+
+    def test_category_filter(self):
+        self.create_place('other')
+        gym = self.create_place('gym', category=PlaceCategory.GYM)
+
+        data = self.get_available(category=PlaceCategory.GYM)
+
+        self.assertEqual([p['id'] for p in data['results']], [gym.pk])
+
+    def test_invalid_category(self):
+        response = self.client.get(
+            '/api/places/available/', {'date': self.date.isoformat(), 'time': '10:30', 'category': 'x'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_query_count_does_not_depend_on_places(self):
+        for i in range(10):
+            self.book(self.create_place(f'place {i}', capacity=2))
+
+        # count и страница: в списке нет менеджеров
+        with self.assertNumQueries(2):
+            data = self.get_available(page_size=5)
+
+        self.assertEqual(data['count'], 10)
+        self.assertEqual(len(data['results']), 5)
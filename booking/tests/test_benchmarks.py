@@ -0,0 +1,71 @@
+import json
+import tempfile
+from collections import defaultdict
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from booking.benchmarks import SCENARIOS
+from booking.models import Booking, BookingStatus, Place, SlotOccupancy
+from booking.occupancy import rebuild_occupancy
+
+
+class FakeDataTest(TestCase):
+    def test_generated_data_respects_capacity(self):
+        call_command(
+            'generate_fake_data', places=3, users=5, bookings=300, days=10, future_days=5, seed=1,
+            stdout=StringIO()
+        )
+
+        self.assertEqual(Place.objects.count(), 3)
+        self.assertGreater(Booking.objects.count(), 0)
+        self.assertTrue(Booking.objects.filter(status=BookingStatus.COMPLETED).exists())
+
+        generated = {
+            (row.place_id, row.date, row.slot_start): row.used
+            for row in SlotOccupancy.objects.filter(used__gt=0)
+        }
+        for place in Place.objects.all():
+            self.assertFalse(SlotOccupancy.objects.filter(place=place, used__gt=place.capacity).exists())
+
+        dates = defaultdict(set)
+        for place_id, date in Booking.objects.values_list('place_id', 'date').distinct():
+            dates[place_id].add(date)
+        for place in Place.objects.all():
+            rebuild_occupancy(place, dates[place.pk])
+        rebuilt = {
+            (row.place_id, row.date, row.slot_start): row.used
+            for row in SlotOccupancy.objects.filter(used__gt=0)
+        }
+        self.assertEqual(generated, rebuilt)
+
+
+class BenchmarkCommandTest(TestCase):
+    def test_writes_machine_readable_results(self):
+        call_command('generate_fake_data', places=2, users=3, bookings=50, seed=2, stdout=StringIO())
+        output = Path(tempfile.mkdtemp()) / 'bench.json'
+
+        call_command('benchmark', repeat=1, output=output, stdout=StringIO())
+
+        report = json.loads(output.read_text())
+        self.assertEqual(set(report['results']), set(SCENARIOS))
+        for result in report['results'].values():
+            self.assertEqual(set(result), {'runs', 'wall_ms', 'db_ms', 'queries', 'rows'})
+            self.assertGreater(result['queries'], 0)
+        self.assertEqual(Booking.objects.count(), report['data']['bookings'])
+
+
+class RendererBenchmarkCommandTest(TestCase):
+    def test_compares_renderers(self):
+        output = Path(tempfile.mkdtemp()) / 'renderers.json'
+
+        with self.assertNumQueries(0):
+            call_command('benchmark_renderers', count=50, repeat=1, output=output, stdout=StringIO())
+
+        report = json.loads(output.read_text())
+        self.assertEqual(set(report['results']), {'json', 'orjson', 'msgpack'})
+        self.assertEqual(report['results']['json']['bytes'], report['results']['orjson']['bytes'])
+        for result in report['results'].values():
+            self.assertEqual(set(result), {'serialize_ms', 'render_ms', 'total_ms', 'bytes'})
@@ -0,0 +1,70 @@
+from datetime import time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from booking.models import Booking, Place, SlotOccupancy
+from logs.models import ActivityLog
+
+
+class BulkBookingTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.place = Place.objects.create(
+            name='Test Place', open_time=time(8), close_time=time(12), capacity=1
+        )
+
+    def item(self, start, end, place=None, date='2030-01-10'):
+        return {
+            'place': place or self.place.pk,
+            'date': date,
+            'start_time': start,
+            'end_time': end,
+        }
+
+    def test_per_item_results(self):
+        Booking.objects.create(
+            user=self.user, place=self.place, date='2030-01-10',
+            start_time=time(8), end_time=time(9)
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/bookings/bulk/', [
+                self.item('08:00', '09:00'),
+                self.item('09:00', '10:00'),
+                self.item('09:00', '10:00'),
+                self.item('09:30', '10:30'),
+                self.item('10:00', '11:00', place=999999),
+                self.item('10:00', '11:00', date='2030-01-11'),
+            ], format='json')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['created'], 2)
+        self.assertEqual(
+            [result['status'] for result in data['results']],
+            ['conflict', 'created', 'conflict', 'invalid', 'invalid', 'created']
+        )
+        self.assertEqual(Booking.objects.count(), 3)
+        self.assertEqual(
+            SlotOccupancy.objects.get(place=self.place, date='2030-01-10', slot_start=time(9)).used, 1
+        )
+        self.assertEqual(ActivityLog.objects.filter(action='Создал бронь').count(), 2)
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        items = [self.item(f'{hour:02d}:00', f'{hour + 1:02d}:00', date=f'2030-01-{day:02d}')
+                 for day in range(10, 20) for hour in range(8, 12)]
+
+        # место, savepoint, строки занятости, блокировка, обновление, брони, savepoint;
+        # журнал пишется после коммита
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/bookings/bulk/', items, format='json')
+
+        self.assertEqual(response.json()['created'], 40)
+
+    def test_rejects_non_list(self):
+        response = self.client.post('/api/bookings/bulk/', {'place': 1}, format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,106 @@
+from datetime import date, time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking.cache import get_cache_stats
+from booking.models import Booking, BookingStatus, Place
+from booking.serializers import PlaceManagerUpdateSerializer
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class AvailabilityCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.place = Place.objects.create(
+            name='Test Place', open_time=time(8), close_time=time(12), capacity=1
+        )
+        self.date = date(2030, 1, 10)
+
+    def get_slots(self):
+        response = self.client.get(
+            f'/api/places/{self.place.pk}/available-times/', {'date': self.date.isoformat()}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def get_available(self):
+        response = self.client.get(
+            '/api/places/available/', {'date': self.date.isoformat(), 'time': '09:30'}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def book(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                user=self.user, place=self.place, date=self.date,
+                start_time=time(9), end_time=time(10)
+            )
+
+    def test_available_times_hit_and_miss(self):
+        self.get_slots()
+
+        with self.assertNumQueries(1):
+            self.get_slots()
+
+        self.assertEqual(get_cache_stats(), {'hits': 1, 'misses': 1})
+
+    def test_booking_invalidates_responses(self):
+        self.assertEqual(self.get_slots()[1]['current_bookings'], 0)
+        self.assertEqual(self.get_available()['count'], 1)
+
+        booking = self.book()
+
+        self.assertEqual(self.get_slots()[1]['current_bookings'], 1)
+        self.assertEqual(self.get_available()['count'], 0)
+
+        booking.status = BookingStatus.CANCELLED
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+
+        self.assertEqual(self.get_slots()[1]['current_bookings'], 0)
+        self.assertEqual(self.get_available()['count'], 1)
+
+    @override_settings(ALLOWED_HOSTS=['first.example.com', 'second.example.com'])
+    def test_available_links_follow_request_host(self):
+        Place.objects.create(name='Second Place', open_time=time(8), close_time=time(12), capacity=1)
+        params = {'date': self.date.isoformat(), 'time': '09:30', 'page_size': 1}
+        self.client.get('/api/places/available/', params, HTTP_HOST='first.example.com')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/places/available/', params, HTTP_HOST='second.example.com', secure=True)
+
+        data = response.json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(len(data['results']), 1)
+        self.assertTrue(data['next'].startswith('https://second.example.com/api/places/available/'), data['next'])
+        self.assertEqual(get_cache_stats(), {'hits': 1, 'misses': 1})
+
+    def test_manager_update_invalidates_responses(self):
+        self.assertEqual(len(self.get_slots()), 4)
+
+        serializer = PlaceManagerUpdateSerializer(self.place, data={'slot_duration': 30}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer.save()
+
+        self.assertEqual(len(self.get_slots()), 8)
+
+    def test_warm_command(self):
+        out = StringIO()
+        call_command('warm_availability_cache', days=3, places=1, stdout=out)
+
+        self.assertIn('Прогрето 3', out.getvalue())
+        with self.assertNumQueries(1):
+            self.client.get(
+                f'/api/places/{self.place.pk}/available-times/',
+                {'date': timezone.localdate().isoformat()}
+            )
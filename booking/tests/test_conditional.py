@@ -0,0 +1,112 @@
+from datetime import date, time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from booking.cache import place_version_key, slots_version_key
+from booking.models import Booking, Place
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.place = Place.objects.create(name='Зал', open_time=time(8), close_time=time(12), capacity=1)
+        self.date = date(2030, 1, 10)
+
+    def get(self, url, etag=None, **params):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, params, **headers)
+
+    def test_available_times_revalidation(self):
+        url = f'/api/places/{self.place.pk}/available-times/'
+        first = self.get(url, date=self.date.isoformat())
+        etag = first['ETag']
+
+        # только сам объект, брони не читаются
+        with self.assertNumQueries(1):
+            response = self.get(url, etag, date=self.date.isoformat())
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(
+                user=self.user, place=self.place, date=self.date, start_time=time(9), end_time=time(10)
+            )
+
+        response = self.get(url, etag, date=self.date.isoformat())
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.get(url, etag, date='2030-01-11').status_code, 200)
+
+    def test_retrieve_revalidation(self):
+        url = f'/api/places/{self.place.pk}/'
+        first = self.get(url)
+        self.assertEqual(first['Last-Modified'], http_date(self.place.updated_at.timestamp()))
+
+        # объект с менеджерами, сериализация не выполняется
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get(url, first['ETag']).status_code, 304)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.place.managers.add(self.user)
+
+        response = self.get(url, first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['managers'], [self.user.pk])
+
+    def test_missing_place_does_not_create_versions(self):
+        missing = self.place.pk + 1
+
+        self.assertEqual(self.get(f'/api/places/{missing}/').status_code, 404)
+        self.assertEqual(self.get(f'/api/places/{missing}/available-times/', date='2030-01-10').status_code, 404)
+        self.assertEqual(self.get(f'/api/places/{self.place.pk}/available-times/', date='10.01.2030').status_code, 400)
+
+        self.assertEqual(cache.get_many([
+            place_version_key(missing), slots_version_key(missing, self.date), place_version_key(self.place.pk)
+        ]), {})
+
+    def test_list_revalidation(self):
+        first = self.get('/api/places/')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get('/api/places/', first['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.place.name = 'Новый зал'
+            self.place.save()
+
+        response = self.get('/api/places/', first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['name'], 'Новый зал')
+
+    def test_cache_outage_disables_revalidation(self):
+        urls = [
+            (f'/api/places/{self.place.pk}/', {}),
+            (f'/api/places/{self.place.pk}/available-times/', {'date': self.date.isoformat()}),
+            ('/api/places/', {}),
+        ]
+        etags = [self.get(url, **params)['ETag'] for url, params in urls]
+
+        # Так ведёт себя django-redis с IGNORE_EXCEPTIONS, когда Redis недоступен
+        outage = mock.MagicMock()
+        outage.get_many.return_value = {}
+        outage.get.return_value = None
+        with mock.patch('booking.cache.cache', outage):
+            for (url, params), etag in zip(urls, etags):
+                response = self.get(url, etag, **params)
+                self.assertEqual(response.status_code, 200, url)
+                self.assertFalse(response.has_header('ETag'), url)
+                self.assertFalse(response.has_header('Last-Modified'), url)
+
+            response = self.client.get(urls[0][0], HTTP_IF_MODIFIED_SINCE=http_date(self.place.updated_at.timestamp()))
+            self.assertEqual(response.status_code, 200)
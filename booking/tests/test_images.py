@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+from datetime import time
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from booking.images import build_image_variants, delete_image_files
+from booking.models import Place
+
+
+def make_image(width=2000, height=1000):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'red').save(buffer, 'JPEG')
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PlaceImageVariantsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(username='admin', password='1234', is_staff=True)
+        self.client.force_authenticate(self.admin)
+
+    def place_data(self):
+        return {'name': 'Зал', 'open_time': '08:00', 'close_time': '20:00', 'capacity': 1,
+                'bio': 'Описание', 'location': 'Центр', 'image': make_image()}
+
+    def create_place(self):
+        data = self.place_data()
+        with mock.patch('booking.views.generate_place_image_variants.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post('/api/places/', data, format='multipart')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json(), delay
+
+    def test_upload_schedules_variants(self):
+        data, delay = self.create_place()
+
+        delay.assert_called_once_with(data['id'])
+        # До обработки все размеры ссылаются на оригинал
+        self.assertEqual(set(data['image_srcset']), {'webp', 'jpeg'})
+        self.assertEqual(set(data['image_srcset']['webp'].values()), {data['image']})
+
+    def test_build_variants(self):
+        data, _ = self.create_place()
+
+        variants = build_image_variants(data['id'])
+
+        for extension, image_format in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+            for width, name in variants[extension].items():
+                with default_storage.open(name) as file, Image.open(file) as image:
+                    self.assertEqual(image.format, image_format)
+                    self.assertEqual(image.size, (int(width), int(width) // 2))
+
+        response = self.client.get(f'/api/places/{data["id"]}/')
+        srcset = response.json()['image_srcset']
+        self.assertTrue(srcset['webp']['320'].endswith('_320w.webp'))
+        self.assertTrue(srcset['jpeg']['1280'].endswith('_1280w.jpeg'))
+
+    def test_small_image_is_not_upscaled(self):
+        place = Place.objects.create(name='Зал', open_time=time(8), close_time=time(20), capacity=1)
+        place.image.save('small.jpg', make_image(500, 250))
+
+        variants = build_image_variants(place.pk)
+
+        with default_storage.open(variants['webp']['1280']) as file, Image.open(file) as image:
+            self.assertEqual(image.size, (500, 250))
+
+    def test_replaced_image_resets_variants(self):
+        data, _ = self.create_place()
+        build_image_variants(data['id'])
+
+        with mock.patch('booking.views.generate_place_image_variants.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.put(f'/api/places/{data["id"]}/', self.place_data(), format='multipart')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        delay.assert_called_once_with(data['id'])
+        self.assertEqual(Place.objects.get(pk=data['id']).image_variants, {})
+
+    def test_replaced_image_files_are_deleted(self):
+        data, _ = self.create_place()
+        old_variants = build_image_variants(data['id'])
+        old_image = Place.objects.get(pk=data['id']).image.name
+        self.assertNotIn('image_variants', self.client.get(f'/api/places/{data["id"]}/').json())
+
+        with mock.patch('booking.views.generate_place_image_variants.delay'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.put(f'/api/places/{data["id"]}/', self.place_data(), format='multipart')
+
+        new_image = Place.objects.get(pk=data['id']).image.name
+        self.assertNotEqual(new_image, old_image)
+        self.assertTrue(default_storage.exists(new_image))
+        for name in [old_image, old_variants['webp']['320'], old_variants['jpeg']['1280']]:
+            self.assertFalse(default_storage.exists(name), name)
+
+    def test_delete_image_files_without_variants(self):
+        place = Place.objects.create(name='Зал', open_time=time(8), close_time=time(20), capacity=1)
+        place.image.save('small.jpg', make_image(500, 250))
+
+        delete_image_files(place.image.name)
+
+        self.assertFalse(default_storage.exists(place.image.name))
@@ -0,0 +1,78 @@
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from booking.models import Booking, BookingStatus, Place
+
+
+class BookingListTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.manager = get_user_model().objects.create_user(username='manager', password='1234', role='manager')
+        self.place = Place.objects.create(name='Зал', open_time=time(8), close_time=time(20), capacity=5)
+        self.other_place = Place.objects.create(name='Другой', open_time=time(8), close_time=time(20), capacity=5)
+
+    def book(self, day, hour, user=None, place=None, status=BookingStatus.PENDING):
+        return Booking.objects.create(
+            user=user or self.user, place=place or self.place, date=date(2030, 1, day),
+            start_time=time(hour), end_time=time(hour + 1), status=status
+        )
+
+    def test_cursor_pages_follow_model_ordering(self):
+        bookings = [self.book(day, hour) for day in (10, 11, 12) for hour in (9, 10)]
+        bookings += [self.book(11, 10), self.book(11, 10)]
+        self.client.force_authenticate(self.user)
+
+        seen = []
+        url = '/api/bookings/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(booking['id'] for booking in response.json()['results'])
+            url = response.json()['next']
+
+        expected = sorted(bookings, key=lambda booking: (-booking.date.toordinal(), booking.start_time, booking.pk))
+        self.assertEqual(seen, [booking.pk for booking in expected])
+
+    def test_page_size_is_capped(self):
+        for hour in range(8, 19):
+            for day in range(1, 11):
+                self.book(day, hour)
+        self.client.force_authenticate(self.manager)
+
+        response = self.client.get('/api/bookings/', {'page_size': 1000})
+
+        self.assertEqual(len(response.json()['results']), 100)
+        self.assertIsNotNone(response.json()['next'])
+
+    def test_filters(self):
+        self.book(9, 10)
+        expected = self.book(10, 10, place=self.other_place, status=BookingStatus.CONFIRMED)
+        self.book(10, 11, place=self.other_place)
+        self.book(10, 12, place=self.place, status=BookingStatus.CONFIRMED)
+        self.book(12, 10, place=self.other_place, status=BookingStatus.CONFIRMED)
+        self.client.force_authenticate(self.manager)
+
+        response = self.client.get('/api/bookings/', {
+            'from': '2030-01-10', 'to': '2030-01-11', 'place': self.other_place.pk, 'status': 'confirmed'
+        })
+
+        self.assertEqual([booking['id'] for booking in response.json()['results']], [expected.pk])
+
+    def test_user_sees_only_own_bookings(self):
+        own = self.book(10, 10)
+        self.book(10, 11, user=self.manager)
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get('/api/bookings/')
+
+        self.assertEqual([booking['id'] for booking in response.json()['results']], [own.pk])
+
+    def test_invalid_filters(self):
+        self.client.force_authenticate(self.user)
+
+        for params in ({'from': '10.01.2030'}, {'place': 'x'}, {'status': 'unknown'}):
+            self.assertEqual(self.client.get('/api/bookings/', params).status_code, 400)
@@ -0,0 +1,66 @@
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from booking.models import Booking, BookingStatus, Place
+
+
+class MyBookingsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.manager = get_user_model().objects.create_user(username='manager', password='1234', role='manager')
+        self.place = Place.objects.create(name='Зал', open_time=time(8), close_time=time(20), capacity=5)
+        self.client.force_authenticate(self.user)
+
+    def book(self, day, hour, status=BookingStatus.PENDING, user=None):
+        return Booking.objects.create(
+            user=user or self.user, place=self.place, date=date(2030, 1, day),
+            start_time=time(hour), end_time=time(hour + 1), status=status
+        )
+
+    def get_my(self, **params):
+        response = self.client.get('/api/bookings/my/', params)
+        self.assertEqual(response.status_code, 200)
+        return {status: [booking['id'] for booking in bookings] for status, bookings in response.json().items()}
+
+    def test_buckets_in_one_query(self):
+        pending = self.book(10, 10)
+        confirmed = self.book(10, 11, status=BookingStatus.CONFIRMED)
+        completed = [self.book(day, 12, status=BookingStatus.COMPLETED) for day in (1, 2, 3)]
+        self.book(10, 12, user=self.manager)
+
+        with self.assertNumQueries(1):
+            data = self.get_my()
+
+        self.assertEqual(data, {
+            'pending': [pending.pk],
+            'confirmed': [confirmed.pk],
+            'completed': [booking.pk for booking in reversed(completed)],
+            'cancelled': [],
+        })
+
+    def test_limit_per_bucket(self):
+        pending = [self.book(10, hour) for hour in (9, 10, 11)]
+        completed = [self.book(day, 12, status=BookingStatus.COMPLETED) for day in (1, 2, 3)]
+
+        data = self.get_my(limit=2)
+
+        self.assertEqual(data['pending'], [pending[0].pk, pending[1].pk])
+        self.assertEqual(data['completed'], [completed[2].pk, completed[1].pk])
+
+    def test_since_limits_archive_only(self):
+        old_pending = self.book(1, 10)
+        self.book(1, 11, status=BookingStatus.CANCELLED)
+        recent = self.book(5, 11, status=BookingStatus.CANCELLED)
+
+        data = self.get_my(since='2030-01-03')
+
+        self.assertEqual(data['pending'], [old_pending.pk])
+        self.assertEqual(data['cancelled'], [recent.pk])
+
+    def test_invalid_params(self):
+        for params in ({'limit': 0}, {'limit': 'x'}, {'since': '03.01.2030'}):
+            self.assertEqual(self.client.get('/api/bookings/my/', params).status_code, 400)
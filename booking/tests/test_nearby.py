@@ -0,0 +1,131 @@
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from booking.geo import GRID_COLUMNS, grid_cell, grid_cell_ranges
+from booking.models import Booking, Place, PlaceCategory
+
+
+class GridTest(TestCase):
+    def covered(self, latitude, longitude, radius, point):
+        cell = grid_cell(*point)
+        return any(first <= cell <= last for first, last in grid_cell_ranges(latitude, longitude, radius))
+
+    def test_generated_column_matches_python(self):
+        for latitude, longitude in ((55.7558, 37.6173), (-33.8688, 151.2093), (90, 180), (-90, -180), (0.05, -0.05)):
+            place = Place.objects.create(
+                name='Зал', bio='', location='', open_time=time(8), close_time=time(20),
+                latitude=latitude, longitude=longitude
+            )
+            place.refresh_from_db()
+            self.assertEqual(place.grid_cell, grid_cell(latitude, longitude))
+
+    def test_ranges_cover_circle(self):
+        # Точки на расстоянии ~4.5 км к северу, югу, востоку и западу
+        center = (55.75, 37.62)
+        for point in ((55.79, 37.62), (55.71, 37.62), (55.75, 37.69), (55.75, 37.55)):
+            self.assertTrue(self.covered(*center, 5, point), point)
+        self.assertFalse(self.covered(*center, 5, (56.5, 37.62)))
+
+    def test_antimeridian(self):
+        ranges = grid_cell_ranges(0, 179.99, 10)
+
+        self.assertTrue(any(first % GRID_COLUMNS == 0 for first, _ in ranges))
+        self.assertTrue(self.covered(0, 179.99, 10, (0, -179.99)))
+
+    def test_pole(self):
+        ranges = grid_cell_ranges(89.99, 0, 10)
+
+        self.assertIn((grid_cell(89.99, -180), grid_cell(89.99, 180)), ranges)
+
+
+class NearbyPlacesTest(TestCase):
+    center = {'lat': 55.7558, 'lon': 37.6173}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.date = date(2030, 1, 10)
+
+    def create_place(self, name, latitude, longitude, **kwargs):
+        defaults = dict(
+            name=name, bio='', location='', open_time=time(8), close_time=time(20), capacity=1,
+            latitude=latitude, longitude=longitude
+        )
+        defaults.update(kwargs)
+        return Place.objects.create(**defaults)
+
+    def get_nearby(self, **params):
+        response = self.client.get('/api/places/nearby/', {**self.center, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_orders_by_distance_within_radius(self):
+        far = self.create_place('far', 55.80, 37.6173)
+        near = self.create_place('near', 55.76, 37.62)
+        # Соседняя ячейка сетки по долготе
+        across = self.create_place('across', 55.7558, 37.69)
+        self.create_place('outside', 55.90, 37.6173)
+        self.create_place('no coordinates', None, None)
+
+        data = self.get_nearby(radius=6)
+
+        self.assertEqual([p['id'] for p in data['results']], [near.pk, across.pk, far.pk])
+        distances = [p['distance'] for p in data['results']]
+        self.assertAlmostEqual(distances[0], 0.5, delta=0.1)
+        self.assertAlmostEqual(distances[2], 4.94, delta=0.05)
+        self.assertEqual(distances, sorted(distances))
+
+    def test_antimeridian(self):
+        place = self.create_place('east', 0, 179.99)
+
+        data = self.get_nearby(lat=0, lon=-179.99)
+
+        self.assertEqual([p['id'] for p in data['results']], [place.pk])
+
+    def test_available_filter(self):
+        free = self.create_place('free', 55.76, 37.62)
+        busy = self.create_place('busy', 55.757, 37.618, category=PlaceCategory.GYM)
+        self.create_place('closed', 55.758, 37.619, open_time=time(12))
+        Booking.objects.create(
+            user=self.user, place=busy, date=self.date, start_time=time(10), end_time=time(11)
+        )
+
+        data = self.get_nearby(date=self.date.isoformat(), time='10:30')
+        self.assertEqual([p['id'] for p in data['results']], [free.pk])
+
+        data = self.get_nearby(category=PlaceCategory.GYM)
+        self.assertEqual([p['id'] for p in data['results']], [busy.pk])
+
+    def test_invalid_params(self):
+        for params in (
+            {'lat': 55},
+            {'lat': 'x', 'lon': 37},
+            {'lat': 91, 'lon': 37},
+            {'lat': 55, 'lon': 37, 'radius': 0},
+            {'lat': 55, 'lon': 37, 'radius': 51},
+            {'lat': 55, 'lon': 37, 'radius': 'nan'},
+            {'lat': 55, 'lon': 37, 'date': '2030-01-10'},
+            {'lat': 55, 'lon': 37, 'date': '10.01.2030', 'time': '10:30'},
+            {'lat': 55, 'lon': 37, 'category': 'x'},
+        ):
+            response = self.client.get('/api/places/nearby/', params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_coordinates_are_set_together(self):
+        self.client.force_authenticate(self.user)
+        data = {
+            'name': 'Зал', 'bio': 'Описание', 'location': 'Центр', 'open_time': '08:00', 'close_time': '20:00',
+            'latitude': 55.75,
+        }
+
+        response = self.client.post('/api/places/', data, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'non_field_errors': ["Широта и долгота задаются вместе."]})
+
+        response = self.client.post('/api/places/', {**data, 'longitude': 37.62}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['longitude'], 37.62)
+        self.assertNotIn('grid_cell', response.json())
@@ -0,0 +1,131 @@
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from booking.models import Booking, BookingStatus, Place
+from booking.occupancy import count_overlaps
+
+
+class CountOverlapsTest(TestCase):
+    def test_counts_intervals_overlapping_each_slot(self):
+        slots = [(time(8), time(9)), (time(9), time(10)), (time(10), time(11))]
+        intervals = [
+            (time(8), time(9)),
+            (time(8, 30), time(9, 30)),
+            (time(10), time(11)),
+            (time(11), time(12)),
+        ]
+
+        self.assertEqual(count_overlaps(slots, intervals), [2, 1, 1])
+
+    def test_no_intervals(self):
+        self.assertEqual(count_overlaps([(time(8), time(9))], []), [0])
+
+
+class AvailableTimesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.date = date(2030, 1, 10)
+
+    def create_place(self, **kwargs):
+        defaults = dict(
+            name='Test Place',
+            open_time=time(8),
+            close_time=time(12),
+            slot_duration=60,
+            capacity=2,
+        )
+        defaults.update(kwargs)
+        return Place.objects.create(**defaults)
+
+    def get_slots(self, place):
+        response = self.client.get(
+            f'/api/places/{place.pk}/available-times/', {'date': self.date.isoformat()}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_response_format(self):
+        place = self.create_place()
+        Booking.objects.create(
+            user=self.user, place=place, date=self.date,
+            start_time=time(9), end_time=time(10)
+        )
+        Booking.objects.create(
+            user=self.user, place=place, date=self.date,
+            start_time=time(9), end_time=time(10)
+        )
+        Booking.objects.create(
+            user=self.user, place=place, date=self.date,
+            start_time=time(10), end_time=time(11), status=BookingStatus.CANCELLED
+        )
+
+        slots = self.get_slots(place)
+
+        self.assertEqual(len(slots), 4)
+        self.assertEqual(slots[1], {
+            'start_time': '09:00',
+            'end_time': '10:00',
+            'availabe': False,
+            'current_bookings': 2,
+            'max_capacity': 2,
+        })
+        self.assertEqual(slots[2]['current_bookings'], 0)
+        self.assertTrue(slots[2]['availabe'])
+
+    def test_query_count_does_not_depend_on_slots(self):
+        short_place = self.create_place(slot_duration=60)
+        long_place = self.create_place(open_time=time(6), close_time=time(23), slot_duration=15)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self.get_slots(short_place)), 4)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self.get_slots(long_place)), 68)
+
+
+class CalendarTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+
+    def test_grid_for_places_and_dates(self):
+        first = Place.objects.create(name='first', open_time=time(8), close_time=time(10), capacity=1)
+        second = Place.objects.create(name='second', open_time=time(8), close_time=time(9), capacity=2)
+        Booking.objects.create(
+            user=self.user, place=first, date=date(2030, 1, 11),
+            start_time=time(9), end_time=time(10)
+        )
+
+        # объекты и занятость всех пар (объект, дата)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/places/calendar/', {
+                'places': f'{first.pk},{second.pk}',
+                'from': '2030-01-10',
+                'to': '2030-01-16',
+            })
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([item['place'] for item in data], [first.pk, second.pk])
+        self.assertEqual(len(data[0]['days']), 7)
+        self.assertEqual(data[0]['days'][1]['date'], '2030-01-11')
+        self.assertEqual(data[0]['days'][1]['slots'][1], {
+            'start_time': '09:00',
+            'end_time': '10:00',
+            'availabe': False,
+            'current_bookings': 1,
+            'max_capacity': 1,
+        })
+        self.assertEqual(len(data[1]['days'][0]['slots']), 1)
+
+    def test_range_limit(self):
+        response = self.client.get('/api/places/calendar/', {
+            'places': '1', 'from': '2030-01-01', 'to': '2030-03-01',
+        })
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,63 @@
+from datetime import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from booking.models import Place
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PlaceListTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.manager = get_user_model().objects.create_user(username='manager', password='1234')
+
+    def create_places(self, count):
+        for i in range(count):
+            place = Place.objects.create(
+                name=f'Зал {i}', bio='Длинное описание', location='Центр', open_time=time(8), close_time=time(20)
+            )
+            place.managers.add(self.manager)
+
+    def list_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/places/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_list_cost_does_not_depend_on_places(self):
+        self.create_places(3)
+        few, _ = self.list_queries()
+        self.create_places(12)
+        many, data = self.list_queries()
+
+        self.assertEqual(few, 1)
+        self.assertEqual(many, 1)
+        self.assertEqual(len(data), 15)
+
+    def test_list_payload_is_lightweight(self):
+        self.create_places(1)
+
+        _, data = self.list_queries()
+
+        place = data[0]
+        for field in ('bio', 'managers', 'image_variants', 'grid_cell'):
+            self.assertNotIn(field, place)
+        self.assertEqual(place['category_display'], 'Другое')
+
+    def test_detail_keeps_full_payload(self):
+        self.create_places(1)
+        place = Place.objects.get()
+
+        # объект и prefetch менеджеров
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/places/{place.pk}/')
+
+        self.assertEqual(response.json()['bio'], 'Длинное описание')
+        self.assertEqual(response.json()['managers'], [self.manager.pk])
@@ -0,0 +1,137 @@
+import json
+import unittest
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.models import Booking, BookingStatus, Place, SlotOccupancy
+from booking.occupancy import OccupancyContext, reserve_slots
+from booking.tasks import expired_bookings_chunk
+
+
+PLACES = 300
+DAYS = 60
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'планы запросов проверяются только на PostgreSQL')
+class HotPathQueryPlansTest(TestCase):
+    """
+    Засевает объём данных, близкий к рабочему (история в основном из закрытых
+    броней), и проверяет по EXPLAIN, что горячие запросы идут по индексам.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        cls.other = get_user_model().objects.create_user(username='other', password='1234')
+        # Рано открывается лишь каждый двадцатый объект
+        # Объекты разнесены по сетке 20 x 15 с шагом около 5 км
+        Place.objects.bulk_create([
+            Place(
+                name=f'place {i}', open_time=time(6) if i % 20 == 0 else time(9), close_time=time(22), capacity=3,
+                latitude=55 + i % 20 * 0.05, longitude=37 + i // 20 * 0.08
+            )
+            for i in range(PLACES)
+        ])
+        cls.places = list(Place.objects.all())
+        cls.date = date(2030, 1, 1) + timedelta(days=DAYS - 1)
+
+        bookings = []
+        for offset in range(DAYS):
+            day = date(2030, 1, 1) + timedelta(days=offset)
+            active = offset == DAYS - 1
+            for index, place in enumerate(cls.places):
+                for hour in (10, 14, 18):
+                    bookings.append(Booking(
+                        user=cls.user if index % 50 == 0 else cls.other,
+                        place=place,
+                        date=day,
+                        start_time=time(hour),
+                        end_time=time(hour + 1),
+                        status=BookingStatus.PENDING if active else BookingStatus.COMPLETED
+                    ))
+        Booking.objects.bulk_create(bookings, batch_size=5000)
+        # Строки занятости остаются и после завершения броней, с used = 0
+        SlotOccupancy.objects.bulk_create([
+            SlotOccupancy(
+                place=booking.place,
+                date=booking.date,
+                slot_start=booking.start_time,
+                used=int(booking.status == BookingStatus.PENDING)
+            )
+            for booking in bookings
+        ], batch_size=5000)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE booking_booking')
+            cursor.execute('ANALYZE booking_place')
+            cursor.execute('ANALYZE booking_slotoccupancy')
+
+    def explain(self, queryset):
+        # Запрос передаётся QuerySet'ом или готовым SQL (например, UPDATE из CaptureQueriesContext)
+        sql, params = (queryset, None) if isinstance(queryset, str) else queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = self.explain(queryset)
+        indexes = {node.get('Index Name') for node in plan_nodes(plan)}
+        self.assertIn(index_name, indexes, json.dumps(plan, indent=2))
+
+    def test_slot_occupancy_lookup(self):
+        place = self.places[0]
+        queryset = SlotOccupancy.objects.filter(place=place, date=self.date).values_list('slot_start', 'used')
+
+        self.assertUsesIndex(queryset, 'unique_slot_occupancy')
+        self.assertEqual(len(OccupancyContext().get_used(place, self.date)), 3)
+
+    def test_reserve_slots_update(self):
+        place = self.places[1]
+        with CaptureQueriesContext(connection) as queries:
+            reserve_slots(place, self.date, time(10), time(11))
+
+        update, = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertUsesIndex(update, 'unique_slot_occupancy')
+        self.assertEqual(SlotOccupancy.objects.get(place=place, date=self.date, slot_start=time(10)).used, 2)
+
+    def test_available_places_early_morning(self):
+        self.assertUsesIndex(Place.objects.available_at(self.date, time(7)), 'place_hours_idx')
+
+    def test_available_places_occupancy_subquery(self):
+        queryset = Place.objects.available_at(self.date, time(10, 30))
+
+        self.assertUsesIndex(queryset, 'booking_active_overlap_idx')
+
+    def test_auto_complete_scan(self):
+        self.assertUsesIndex(expired_bookings_chunk(timezone.localtime()), 'booking_active_expiry_idx')
+
+    def test_user_booking_list(self):
+        queryset = Booking.objects.filter(user=self.user)[:50]
+
+        self.assertUsesIndex(queryset, 'booking_user_order_idx')
+
+    def test_place_search(self):
+        queryset = Place.objects.search('17')
+
+        self.assertUsesIndex(queryset, 'place_search_idx')
+        self.assertEqual(queryset.count(), 11)
+
+    def test_nearby_places(self):
+        queryset = Place.objects.nearby(55.5, 37.56, 3)
+
+        self.assertUsesIndex(queryset, 'place_grid_cell_idx')
+        self.assertEqual(queryset.count(), 1)
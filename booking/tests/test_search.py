@@ -0,0 +1,102 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from booking.models import Place, PlaceCategory
+from booking.search import trigram_available
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PlaceSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Иначе число запросов зависело бы от того, проверял ли наличие pg_trgm предыдущий тест
+        trigram_available.cache_clear()
+        self.client = APIClient()
+
+    def create_place(self, name, bio='', location='', **kwargs):
+        return Place.objects.create(
+            name=name, bio=bio, location=location, open_time=time(8), close_time=time(20), **kwargs
+        )
+
+    def search(self, **params):
+        response = self.client.get('/api/places/search/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def ids(self, data):
+        return [place['id'] for place in data['results']]
+
+    def test_matches_name_location_and_bio(self):
+        by_name = self.create_place('Тренажёрный зал «Атлет»')
+        by_location = self.create_place('Спортклуб', location='ул. Атлетическая, 5')
+        by_bio = self.create_place('Бассейн', bio='Рядом со стадионом Атлет')
+        self.create_place('Сауна', bio='Парная и купель')
+
+        data = self.search(q='атлет')
+
+        # Вес названия выше адреса, адреса — выше описания
+        self.assertEqual(self.ids(data), [by_name.pk, by_location.pk, by_bio.pk])
+        self.assertEqual(data['count'], 3)
+
+    def test_prefix_and_word_forms(self):
+        place = self.create_place('Футбольные поля', bio='Аренда площадок для мини-футбола')
+
+        self.assertEqual(self.ids(self.search(q='футб')), [place.pk])
+        self.assertEqual(self.ids(self.search(q='футбольный')), [place.pk])
+        self.assertEqual(self.ids(self.search(q='футбол площад')), [place.pk])
+        self.assertEqual(self.search(q='футбол теннис')['results'], [])
+
+    def test_operators_are_not_passed_to_tsquery(self):
+        place = self.create_place('Йога студия')
+
+        self.assertEqual(self.ids(self.search(q="йога & | ! ' :*")), [place.pk])
+
+    def test_category_facets(self):
+        gym = self.create_place('Зал на Ленина', category=PlaceCategory.GYM)
+        self.create_place('Зал на Мира', category=PlaceCategory.GYM)
+        self.create_place('Зал для бадминтона', category=PlaceCategory.SPORTS_ARENA)
+        self.create_place('Каток', category=PlaceCategory.SPORTS_ARENA)
+
+        data = self.search(q='зал', category=PlaceCategory.GYM, page_size=1)
+
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(self.ids(data), [gym.pk])
+        self.assertIsNotNone(data['next'])
+        # Фасеты не зависят от выбранной категории
+        self.assertEqual(data['facets'][PlaceCategory.GYM], 2)
+        self.assertEqual(data['facets'][PlaceCategory.SPORTS_ARENA], 1)
+        self.assertEqual(data['facets'][PlaceCategory.POOL], 0)
+
+    def test_query_count(self):
+        for i in range(10):
+            self.create_place(f'Зал {i}')
+
+        # проверка pg_trgm (один раз за процесс), фасеты с числом результатов и страница
+        with self.assertNumQueries(3):
+            data = self.search(q='зал', page_size=5)
+
+        self.assertEqual(data['count'], 10)
+        self.assertEqual(len(data['results']), 5)
+
+    def test_not_modified(self):
+        self.create_place('Зал')
+        response = self.client.get('/api/places/search/', {'q': 'зал'})
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/places/search/', {'q': 'зал'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_invalid_params(self):
+        for params in ({}, {'q': ' '}, {'q': '&!'}, {'q': 'зал', 'category': 'x'}):
+            response = self.client.get('/api/places/search/', params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_typo_tolerance(self):
+        if not trigram_available():
+            self.skipTest('нужно расширение pg_trgm')
+        place = self.create_place('Фитнес клуб Олимпия')
+
+        self.assertEqual(self.ids(self.search(q='олимпиа')), [place.pk])
@@ -0,0 +1,109 @@
+import threading
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from booking.models import Booking, BookingStatus, Place, SlotOccupancy
+from booking.serializers import PlaceManagerUpdateSerializer
+
+
+class SlotOccupancyTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.place = Place.objects.create(
+            name='Test Place', open_time=time(8), close_time=time(12), capacity=1
+        )
+        self.date = date(2030, 1, 10)
+
+    def book(self, start=time(9), end=time(10)):
+        return Booking.objects.create(
+            user=self.user, place=self.place, date=self.date, start_time=start, end_time=end
+        )
+
+    def used(self, slot_start):
+        row = SlotOccupancy.objects.filter(place=self.place, date=self.date, slot_start=slot_start).first()
+        return row.used if row else 0
+
+    def test_create_and_cancel(self):
+        booking = self.book()
+        self.assertEqual(self.used(time(9)), 1)
+
+        with self.assertRaises(ValidationError):
+            self.book()
+
+        booking.status = BookingStatus.CANCELLED
+        booking.save()
+        self.assertEqual(self.used(time(9)), 0)
+
+        self.book()
+        self.assertEqual(self.used(time(9)), 1)
+
+    def test_confirm_keeps_slot(self):
+        booking = Booking.objects.get(pk=self.book().pk)
+        booking.status = BookingStatus.CONFIRMED
+        booking.save()
+
+        self.assertEqual(self.used(time(9)), 1)
+
+    def test_move_and_delete(self):
+        booking = self.book()
+        booking.start_time, booking.end_time = time(10), time(11)
+        booking.save()
+
+        self.assertEqual(self.used(time(9)), 0)
+        self.assertEqual(self.used(time(10)), 1)
+
+        booking.delete()
+        self.assertEqual(self.used(time(10)), 0)
+
+    def test_grid_change_rebuilds_future_dates(self):
+        self.book(time(9), time(10))
+
+        serializer = PlaceManagerUpdateSerializer(self.place, data={'slot_duration': 30}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertEqual(self.used(time(9)), 1)
+        self.assertEqual(self.used(time(9, 30)), 1)
+        self.assertEqual(self.used(time(10)), 0)
+
+
+class ConcurrentBookingTest(TransactionTestCase):
+    def test_parallel_creates_do_not_overbook(self):
+        User = get_user_model()
+        place = Place.objects.create(
+            name='Test Place', open_time=time(8), close_time=time(12), capacity=2
+        )
+        users = [User.objects.create_user(username=f'user{i}', password='1234') for i in range(8)]
+        booking_date = date(2030, 1, 10)
+
+        barrier = threading.Barrier(len(users))
+        results = []
+
+        def create(user):
+            try:
+                barrier.wait()
+                Booking.objects.create(
+                    user=user, place=place, date=booking_date,
+                    start_time=time(9), end_time=time(10)
+                )
+                results.append(True)
+            except ValidationError:
+                results.append(False)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), 2)
+        self.assertEqual(Booking.objects.filter(place=place).count(), 2)
+        self.assertEqual(
+            SlotOccupancy.objects.get(place=place, date=booking_date, slot_start=time(9)).used, 2
+        )
@@ -1,11 +1,15 @@
+import threading
 import pytest
-from datetime import datetime, timedelta, time
+from datetime import date, datetime, timedelta, time
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.db import connection, transaction
 from django.utils import timezone
-from django.test import TestCase
-from booking.models import Booking, BookingStatus, Place
+from django.test import TestCase, TransactionTestCase
+from booking.models import Booking, BookingStatus, Place, SlotOccupancy
 from booking.tasks import auto_complete_bookings
+from logs.models import ActivityLog
 
 
 class BookingTasksTest(TestCase):
@@ -46,3 +50,81 @@ class BookingTasksTest(TestCase):
 
         self.assertEqual(past_booking.status, BookingStatus.COMPLETED)
         self.assertEqual(future_booking.status, BookingStatus.PENDING)
+
+
+class AutoCompleteChunksTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.place = Place.objects.create(name='Test Place', open_time=time(8), close_time=time(20), capacity=5)
+
+    def book(self, day, hour, status=BookingStatus.PENDING):
+        return Booking.objects.create(
+            user=self.user, place=self.place, date=day,
+            start_time=time(hour), end_time=time(hour + 1), status=status
+        )
+
+    def test_completes_in_chunks_and_returns_real_count(self):
+        past = date(2020, 1, 10)
+        for hour in (9, 10, 11):
+            self.book(past, hour)
+            self.book(past, hour, status=BookingStatus.CONFIRMED)
+        self.book(past, 12, status=BookingStatus.CANCELLED)
+        future = self.book(date(2030, 1, 10), 9)
+
+        with mock.patch('booking.tasks.AUTO_COMPLETE_CHUNK_SIZE', 4):
+            with self.captureOnCommitCallbacks(execute=True):
+                completed = auto_complete_bookings()
+
+        self.assertEqual(completed, 6)
+        self.assertEqual(Booking.objects.filter(status=BookingStatus.COMPLETED).count(), 6)
+        self.assertEqual(Booking.objects.get(pk=future.pk).status, BookingStatus.PENDING)
+        self.assertFalse(SlotOccupancy.objects.filter(place=self.place, date=past, used__gt=0).exists())
+        self.assertEqual(ActivityLog.objects.filter(action='Бронь завершена автоматически').count(), 6)
+
+    def test_completes_booking_outside_current_hours(self):
+        booking = self.book(date(2020, 1, 10), 9)
+        Place.objects.filter(pk=self.place.pk).update(open_time=time(12))
+
+        self.assertEqual(auto_complete_bookings(), 1)
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, BookingStatus.COMPLETED)
+
+    def test_nothing_to_complete(self):
+        self.book(date(2030, 1, 10), 9)
+
+        self.assertEqual(auto_complete_bookings(), 0)
+
+
+class ConcurrentAutoCompleteTest(TransactionTestCase):
+    def test_locked_bookings_are_skipped(self):
+        user = get_user_model().objects.create_user(username='testuser', password='1234')
+        place = Place.objects.create(name='Test Place', open_time=time(8), close_time=time(20), capacity=5)
+        past = date(2020, 1, 10)
+        locked, free = [
+            Booking.objects.create(user=user, place=place, date=past, start_time=time(hour), end_time=time(hour + 1))
+            for hour in (9, 10)
+        ]
+
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    list(Booking.objects.select_for_update().filter(pk=locked.pk))
+                    acquired.set()
+                    release.wait(timeout=10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        acquired.wait(timeout=10)
+        try:
+            completed = auto_complete_bookings()
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(completed, 1)
+        self.assertEqual(Booking.objects.get(pk=free.pk).status, BookingStatus.COMPLETED)
+        self.assertEqual(Booking.objects.get(pk=locked.pk).status, BookingStatus.PENDING)
@@ -0,0 +1,86 @@
+from datetime import time
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from booking.models import Booking, BookingStatus, Place
+
+
+def occupancy_reads(queries):
+    return [
+        query for query in queries
+        if query['sql'].startswith('SELECT') and 'booking_slotoccupancy' in query['sql']
+    ]
+
+
+class BookingValidationPipelineTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='client', password='1234')
+        self.manager = User.objects.create_user(username='manager', password='1234', role='manager')
+        self.place = Place.objects.create(
+            name='Test Place', open_time=time(8), close_time=time(12), capacity=1
+        )
+        self.place.managers.add(self.manager)
+        self.client = APIClient()
+
+    def create_booking(self, start='09:00', end='10:00'):
+        self.client.force_authenticate(self.user)
+        return self.client.post('/api/bookings/', {
+            'place': self.place.pk,
+            'date': '2030-01-10',
+            'start_time': start,
+            'end_time': end,
+        }, format='json')
+
+    def test_create_reads_occupancy_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.create_booking()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(occupancy_reads(queries.captured_queries)), 1)
+
+    def test_capacity_and_slot_errors(self):
+        self.create_booking()
+
+        response = self.create_booking()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()['non_field_errors'],
+            ["Максимальное количество бронирований на это время уже достигнуто."]
+        )
+
+        response = self.create_booking('09:30', '10:30')
+        self.assertEqual(response.status_code, 400)
+
+    def test_status_transitions_skip_validation(self):
+        booking_id = self.create_booking().json()['id']
+        self.client.force_authenticate(self.manager)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/api/bookings/{booking_id}/confirm/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(occupancy_reads(queries.captured_queries), [])
+
+        self.client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/api/bookings/{booking_id}/cancel/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(occupancy_reads(queries.captured_queries), [])
+        self.assertEqual(Booking.objects.get(pk=booking_id).status, BookingStatus.CANCELLED)
+
+    def test_reactivating_cancelled_booking_is_validated(self):
+        booking = Booking.objects.get(pk=self.create_booking().json()['id'])
+        booking.status = BookingStatus.CANCELLED
+        booking.save(update_fields=['status'])
+        self.create_booking()
+
+        booking.status = BookingStatus.PENDING
+        with self.assertRaises(ValidationError):
+            booking.save(update_fields=['status'])
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from django.core.exceptions import ValidationError
+
+from .models import Booking
+from .occupancy import CAPACITY_ERROR, OccupancyContext
+from .utils import get_time_slots
+
+
+def validate_booking_time(place, date, start_time, end_time, strict=False):
+    """
+    Проверяет интервал брони относительно рабочего времени объекта.
+    strict дополнительно требует совпадения интервала с одним из слотов сетки.
+    """
+    if start_time < place.open_time or end_time > place.close_time:
+        raise ValidationError("Время бронирования вне рабочего времени объекта.")
+
+    if start_time >= end_time:
+        raise ValidationError("Время начала должно быть раньше времени окончания.")
+
+    if not strict:
+        return
+
+    duration = datetime.combine(date, end_time) - datetime.combine(date, start_time)
+    if duration != timedelta(minutes=place.slot_duration):
+        raise ValidationError("Продолжительность бронирования должна быть равна продолжительности слота.")
+
+    if (start_time, end_time) not in get_time_slots(place, date):
+        raise ValidationError("Выбранное время не соответствует доступным слотам.")
+
+
+def validate_booking(place, date, start_time, end_time, status=None, booking=None, context=None, strict=False):
+    """
+    Единая проверка брони для модели, сериализатора и фоновых задач.
+
+    Занятость читается через context (OccupancyContext), поэтому в рамках
+    одного запроса выполняется не более одного запроса к SlotOccupancy.
+    Закрытые брони и брони, уже занимающие эти же слоты (смена статуса
+    pending -> confirmed), проверку вместимости не проходят.
+
+    Фоновые задачи сейчас только закрывают брони (auto_complete_bookings),
+    поэтому сервис не вызывают; задача, которая создаёт, переносит или
+    возобновляет бронь, обязана пройти через него.
+    """
+    validate_booking_time(place, date, start_time, end_time, strict=strict)
+
+    if status in Booking.get_closed_statuses():
+        return
+
+    if booking is not None and booking.occupied_key == (place.pk, date, start_time, end_time):
+        return
+
+    context = context or OccupancyContext()
+    if not context.has_capacity(place, date, start_time, end_time, booking=booking):
+        raise ValidationError(CAPACITY_ERROR)
@@ -2,12 +2,36 @@ from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from datetime import datetime, timedelta
+from django.db import transaction
+from django.db.models import Q, Window
+from django.db.models.functions import RowNumber
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse, OpenApiParameter
 
-from logs.models import ActivityLog
-from .models import Place, Booking, BookingStatus
-from .serializers import PlaceSerializer, BookingSerializer, PlaceManagerUpdateSerializer
+from logs.activity import log_activity
+from .models import Place, Booking, BookingStatus, PlaceCategory
+from .serializers import (
+    PlaceSerializer, PlaceListSerializer, BookingSerializer, PlaceManagerUpdateSerializer, NearbyPlaceSerializer,
+)
 from .permissions import IsPlaceManager
+from .occupancy import build_available_times, build_calendar
+from .cache import (
+    get_or_build, available_times_key, available_places_key, available_times_etag, place_etag, places_etag,
+)
+from .conditional import not_modified, set_validators
+from .pagination import AvailablePlacePagination, BookingPagination, PlaceSearchPagination
+from .bulk import create_bookings
+from .tasks import generate_place_image_variants
+from .images import delete_image_files
+from .analytics import build_place_analytics
+from .search import search_terms
+
+
+NEARBY_DEFAULT_RADIUS = 5
+NEARBY_MAX_RADIUS = 50
+CALENDAR_MAX_PLACES = 50
+CALENDAR_MAX_DAYS = 31
+BULK_MAX_BOOKINGS = 100
+ANALYTICS_MAX_DAYS = 366
 
 
 @extend_schema_view(
@@ -46,28 +70,74 @@ class PlaceViewSet(viewsets.ModelViewSet):
     queryset = Place.objects.all()
     serializer_class = PlaceSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    # Действия, отдающие списки объектов в облегчённом представлении PlaceListSerializer
+    list_actions = ('list', 'available', 'search', 'nearby')
 
     def get_permissions(self):
-        if self.action == 'partial_update':
+        if self.action in ('partial_update', 'analytics'):
             return [IsPlaceManager()]
         return super().get_permissions()
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.list_actions:
+            # Описание может быть длинным, а в списке оно не выводится
+            return queryset.defer('bio')
+        if self.action in ('retrieve', 'update'):
+            return queryset.prefetch_related('managers')
+        return queryset
+
     def get_serializer_class(self):
         if self.action == 'partial_update':
             return PlaceManagerUpdateSerializer
+        if self.action == 'nearby':
+            return NearbyPlaceSerializer
+        if self.action in self.list_actions:
+            return PlaceListSerializer
         return super().get_serializer_class()
 
+    def schedule_image_variants(self, serializer, place):
+        if serializer.validated_data.get('image'):
+            transaction.on_commit(lambda: generate_place_image_variants.delay(place.pk))
+
+    def list(self, request, *args, **kwargs):
+        # Версия списка меняется при любом изменении объектов, поэтому 304 отдаётся без запросов к БД
+        etag = places_etag()
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        return set_validators(request, super().list(request, *args, **kwargs), etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        # Сначала объект: версия в кэше заводится только для существующих залов
+        place = self.get_object()
+        etag = place_etag(place.pk)
+        response = not_modified(request, etag, place.updated_at)
+        if response is not None:
+            return response
+        return set_validators(request, Response(self.get_serializer(place).data), etag, place.updated_at)
+
     def perform_create(self, serializer):
         place = serializer.save()
-        ActivityLog.objects.create(
+        self.schedule_image_variants(serializer, place)
+        log_activity(
             user=self.request.user,
             action="Создал заведение",
             content_object=place
         )
 
     def perform_update(self, serializer):
-        place = serializer.save()
-        ActivityLog.objects.create(
+        old_image = serializer.instance.image.name
+        # Варианты старого изображения не должны отдаваться вместо нового
+        if 'image' in serializer.validated_data:
+            place = serializer.save(image_variants={})
+        else:
+            place = serializer.save()
+        self.schedule_image_variants(serializer, place)
+        # Файлы удаляются только после фиксации: при откате ссылка на них остаётся в БД
+        if old_image and old_image != place.image.name:
+            transaction.on_commit(lambda: delete_image_files(old_image))
+        log_activity(
             user=self.request.user,
             action="Обновил заведение",
             content_object=place
@@ -87,7 +157,6 @@ class PlaceViewSet(viewsets.ModelViewSet):
         Возвращает доступные тайм-слоты для конкретного объекта на указанную дату.
         Пример: /api/places/1/available-times/?date=2025-06-01
         """
-        place = self.get_object()
         date_str = request.query_params.get('date')
         if not date_str:
             return Response({"error": "Параметр 'date' обязателен в формате YYYY-MM-DD"}, status=400)
@@ -97,48 +166,37 @@ class PlaceViewSet(viewsets.ModelViewSet):
         except ValueError:
             return Response({"error": "Неверный формат даты"}, status=400)
 
-        duration = timedelta(minutes=place.slot_duration)
-        slots = []
-        current = datetime.combine(date, place.open_time)
-        end = datetime.combine(date, place.close_time)
-
-        while current + duration <= end:
-            start_time = current.time()
-            end_time = (current + duration).time()
-
-            overlapping = Booking.objects.filter(
-                place=place,
-                date=date,
-                start_time__lt=end_time,
-                end_time__gt=start_time
-            ).count()
-
-            available = overlapping < place.capacity
-            slots.append({
-                'start_time': start_time.strftime('%H:%M'),
-                'end_time': end_time.strftime('%H:%M'),
-                'availabe': available,
-                'current_bookings': overlapping,
-                'max_capacity': place.capacity
-            })
-
-            current += duration
-
-        return Response(slots)
+        # Совпавший ETag не требует броней; объект нужен, чтобы не заводить версии для несуществующих залов
+        place = self.get_object()
+        etag = available_times_etag(place.pk, date)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        slots = get_or_build(
+            available_times_key(place.pk, date),
+            lambda: build_available_times(place, date)
+        )
+        return set_validators(request, Response(slots), etag)
 
     @extend_schema(
         summary="Список доступных залов",
-        description="Возвращает список залов, доступных для бронирования на указанную дату и время.",
+        description="Возвращает постраничный список залов, доступных для бронирования на указанную дату и время.",
         parameters=[
             OpenApiParameter(name='date', description='Дата YYYY-MM-DD', required=True, type=str),
             OpenApiParameter(name='time', description='Время HH:MM', required=True, type=str),
+            OpenApiParameter(name='category', description='Категория зала', required=False, type=str,
+                             enum=PlaceCategory.values),
+            OpenApiParameter(name='page', description='Номер страницы', required=False, type=int),
+            OpenApiParameter(name='page_size', description='Размер страницы', required=False, type=int),
         ],
         tags=['Залы']
     )
-    @action(detail=False, methods=['get'], url_path='available')
+    @action(detail=False, methods=['get'], url_path='available', pagination_class=AvailablePlacePagination)
     def available(self, request):
         date_str = request.query_params.get('date')
         time_str = request.query_params.get('time')
+        category = request.query_params.get('category')
 
         if not date_str:
             return Response({"error": "Параметр 'date' обязателен в формате YYYY-MM-DD"}, status=400)
@@ -155,30 +213,220 @@ class PlaceViewSet(viewsets.ModelViewSet):
             time = datetime.strptime(time_str, '%H:%M').time()
         except ValueError:
             return Response({"error": "Неверный формат времени"}, status=400)
-        available_places = []
 
-        for place in Place.objects.filter(open_time__lte=time, close_time__gt=time):
-            bookings = Booking.objects.filter(
-                place=place,
-                date=date,
-                start_time__lte=time,
-                end_time__gt=time,
-                status__in=Booking.get_active_statuses()
-            )
+        if category and category not in PlaceCategory.values:
+            return Response({"error": "Неверное значение параметра 'category'"}, status=400)
+
+        def build():
+            places = self.get_queryset().available_at(date, time).order_by('id')
+            if category:
+                places = places.filter(category=category)
+
+            page = self.paginate_queryset(places)
+            return {'count': self.paginator.page.paginator.count, 'results': PlaceListSerializer(page, many=True).data}
+
+        # В кэше только строки страницы и общее число: ссылки next/previous
+        # абсолютные и зависят от хоста и схемы конкретного запроса
+        data = get_or_build(available_places_key(date, time, request.query_params), build)
+        self.paginator.paginate_count(request, data['count'], view=self)
+        return self.get_paginated_response(data['results'])
+
+    @extend_schema(
+        summary="Объекты поблизости",
+        description=(
+            "Возвращает объекты в радиусе от точки, ближайшие первыми. "
+            "С параметрами date и time — только объекты, свободные в это время."
+        ),
+        parameters=[
+            OpenApiParameter(name='lat', description='Широта', required=True, type=float),
+            OpenApiParameter(name='lon', description='Долгота', required=True, type=float),
+            OpenApiParameter(
+                name='radius',
+                description=f'Радиус в км, по умолчанию {NEARBY_DEFAULT_RADIUS}, не более {NEARBY_MAX_RADIUS}',
+                required=False,
+                type=float
+            ),
+            OpenApiParameter(name='date', description='Дата в формате YYYY-MM-DD', required=False, type=str),
+            OpenApiParameter(name='time', description='Время в формате HH:MM', required=False, type=str),
+            OpenApiParameter(name='category', description='Категория объекта', required=False, type=str),
+        ],
+        tags=['Залы']
+    )
+    @action(detail=False, methods=['get'], url_path='nearby', pagination_class=AvailablePlacePagination)
+    def nearby(self, request):
+        date_str = request.query_params.get('date')
+        time_str = request.query_params.get('time')
+        category = request.query_params.get('category')
+
+        try:
+            latitude = float(request.query_params['lat'])
+            longitude = float(request.query_params['lon'])
+            radius = float(request.query_params.get('radius', NEARBY_DEFAULT_RADIUS))
+        except KeyError:
+            return Response({"error": "Параметры 'lat' и 'lon' обязательны"}, status=400)
+        except ValueError:
+            return Response({"error": "Неверный формат координат или радиуса"}, status=400)
+
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return Response({"error": "Координаты вне допустимого диапазона"}, status=400)
+
+        if not 0 < radius <= NEARBY_MAX_RADIUS:
+            return Response({"error": f"Радиус должен быть больше 0 и не больше {NEARBY_MAX_RADIUS} км"}, status=400)
+
+        if bool(date_str) != bool(time_str):
+            return Response({"error": "Параметры 'date' и 'time' задаются вместе"}, status=400)
+
+        if category and category not in PlaceCategory.values:
+            return Response({"error": "Неверное значение параметра 'category'"}, status=400)
+
+        places = self.get_queryset()
+        if date_str:
+            try:
+                date = datetime.strptime(date_str, '%Y-%m-%d').date()
+                time = datetime.strptime(time_str, '%H:%M').time()
+            except ValueError:
+                return Response({"error": "Неверный формат даты или времени"}, status=400)
+            places = places.available_at(date, time)
+
+        places = places.nearby(latitude, longitude, radius).order_by('distance', 'id')
+        if category:
+            places = places.filter(category=category)
+
+        page = self.paginate_queryset(places)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @extend_schema(
+        summary="Поиск объектов",
+        description=(
+            "Полнотекстовый поиск по названию, адресу и описанию с учётом префиксов слов. "
+            "Результаты упорядочены по релевантности, в facets — число найденных объектов по категориям."
+        ),
+        parameters=[
+            OpenApiParameter(name='q', description='Поисковый запрос', required=True, type=str),
+            OpenApiParameter(name='category', description='Категория объекта', required=False, type=str),
+        ],
+        tags=['Залы']
+    )
+    @action(detail=False, methods=['get'], url_path='search', pagination_class=PlaceSearchPagination)
+    def search(self, request):
+        text = request.query_params.get('q', '').strip()
+        category = request.query_params.get('category')
+
+        if not search_terms(text):
+            return Response({"error": "Параметр 'q' обязателен"}, status=400)
+
+        if category and category not in PlaceCategory.values:
+            return Response({"error": "Неверное значение параметра 'category'"}, status=400)
+
+        etag = places_etag()
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        places = self.get_queryset().search(text)
+        # Фасеты считаются без фильтра по категории и заодно дают число результатов для пагинации
+        facets = places.category_facets()
+        if category:
+            places = places.filter(category=category)
+
+        page = self.paginator.paginate_queryset(
+            places.ranked(text),
+            request,
+            view=self,
+            count=facets[category] if category else sum(facets.values())
+        )
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        response.data['facets'] = facets
+        return set_validators(request, response, etag)
+
+    @extend_schema(
+        summary="Календарь доступности",
+        description="Возвращает сетку тайм-слотов для нескольких объектов на диапазон дат одним запросом.",
+        parameters=[
+            OpenApiParameter(name='places', description='ID объектов через запятую', required=True, type=str),
+            OpenApiParameter(name='from', description='Начальная дата YYYY-MM-DD', required=True, type=str),
+            OpenApiParameter(name='to', description='Конечная дата YYYY-MM-DD', required=True, type=str),
+        ],
+        tags=['Залы']
+    )
+    @action(detail=False, methods=['get'], url_path='calendar')
+    def calendar(self, request):
+        places_str = request.query_params.get('places')
+        from_date_str = request.query_params.get('from')
+        to_date_str = request.query_params.get('to')
+
+        if not places_str:
+            return Response({"error": "Параметр 'places' обязателен"}, status=400)
+
+        if not from_date_str or not to_date_str:
+            return Response({"error": "Параметры 'from' и 'to' обязательны в формате YYYY-MM-DD"}, status=400)
+
+        try:
+            place_ids = {int(place_id) for place_id in places_str.split(',')}
+        except ValueError:
+            return Response({"error": "Неверный формат параметра 'places'"}, status=400)
+
+        if len(place_ids) > CALENDAR_MAX_PLACES:
+            return Response({"error": f"Можно запросить не более {CALENDAR_MAX_PLACES} объектов"}, status=400)
 
-            if bookings.count() < place.capacity:
-                available_places.append(place)
+        try:
+            from_date = datetime.strptime(from_date_str, '%Y-%m-%d').date()
+            to_date = datetime.strptime(to_date_str, '%Y-%m-%d').date()
+        except ValueError:
+            return Response({"error": "Неверный формат даты"}, status=400)
 
-        if not available_places:
-            return Response([], status=200)
+        days = (to_date - from_date).days + 1
+        if days < 1:
+            return Response({"error": "Дата 'from' должна быть не позже 'to'"}, status=400)
 
-        return Response(PlaceSerializer(available_places, many=True).data)
+        if days > CALENDAR_MAX_DAYS:
+            return Response({"error": f"Диапазон не может превышать {CALENDAR_MAX_DAYS} дней"}, status=400)
+
+        places = list(Place.objects.filter(pk__in=place_ids).order_by('id'))
+        dates = [from_date + timedelta(days=offset) for offset in range(days)]
+        return Response(build_calendar(places, dates))
+
+    @extend_schema(
+        summary="Аналитика загрузки зала",
+        description="Брони по дням, заполняемость (занятые слоты к вместимости x числу слотов) "
+                    "и доля отмен за диапазон дат. Данные берутся из дневной сводки, "
+                    "которая обновляется фоновой задачей.",
+        parameters=[
+            OpenApiParameter(name='from', description='Начальная дата YYYY-MM-DD', required=True, type=str),
+            OpenApiParameter(name='to', description='Конечная дата YYYY-MM-DD', required=True, type=str),
+        ],
+        tags=['Залы']
+    )
+    @action(detail=True, methods=['get'], url_path='analytics')
+    def analytics(self, request, pk=None):
+        place = self.get_object()
+        from_date_str = request.query_params.get('from')
+        to_date_str = request.query_params.get('to')
+
+        if not from_date_str or not to_date_str:
+            return Response({"error": "Параметры 'from' и 'to' обязательны в формате YYYY-MM-DD"}, status=400)
+
+        try:
+            from_date = datetime.strptime(from_date_str, '%Y-%m-%d').date()
+            to_date = datetime.strptime(to_date_str, '%Y-%m-%d').date()
+        except ValueError:
+            return Response({"error": "Неверный формат даты"}, status=400)
+
+        days = (to_date - from_date).days + 1
+        if days < 1:
+            return Response({"error": "Дата 'from' должна быть не позже 'to'"}, status=400)
+
+        if days > ANALYTICS_MAX_DAYS:
+            return Response({"error": f"Диапазон не может превышать {ANALYTICS_MAX_DAYS} дней"}, status=400)
+
+        return Response(build_place_analytics(place, from_date, to_date))
 
 
 class BookingViewSet(viewsets.ModelViewSet):
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BookingPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -189,6 +437,72 @@ class BookingViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @extend_schema(
+        summary="Список бронирований",
+        description="Возвращает бронирования постранично (курсор по дате, времени начала и ID). "
+                    "Фильтры применяются в запросе к базе.",
+        parameters=[
+            OpenApiParameter(name='from', description='Начальная дата YYYY-MM-DD', required=False, type=str),
+            OpenApiParameter(name='to', description='Конечная дата YYYY-MM-DD', required=False, type=str),
+            OpenApiParameter(name='place', description='ID объекта', required=False, type=int),
+            OpenApiParameter(name='status', description='Статус брони', required=False, type=str,
+                             enum=BookingStatus.values),
+        ],
+        tags=['Бронирования']
+    )
+    def list(self, request):
+        from_date_str = request.query_params.get('from')
+        to_date_str = request.query_params.get('to')
+        place_str = request.query_params.get('place')
+        status = request.query_params.get('status')
+
+        bookings = self.get_queryset()
+
+        try:
+            if from_date_str:
+                bookings = bookings.filter(date__gte=datetime.strptime(from_date_str, '%Y-%m-%d').date())
+            if to_date_str:
+                bookings = bookings.filter(date__lte=datetime.strptime(to_date_str, '%Y-%m-%d').date())
+        except ValueError:
+            return Response({"error": "Неверный формат даты"}, status=400)
+
+        if place_str:
+            try:
+                bookings = bookings.filter(place_id=int(place_str))
+            except ValueError:
+                return Response({"error": "Неверное значение параметра 'place'"}, status=400)
+
+        if status:
+            if status not in BookingStatus.values:
+                return Response({"error": "Неверное значение параметра 'status'"}, status=400)
+            bookings = bookings.filter(status=status)
+
+        page = self.paginate_queryset(bookings)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @extend_schema(
+        summary="Массовое создание бронирований",
+        description="Создаёт пакет бронирований в одной транзакции. "
+                    "Для каждого элемента возвращается статус: created, conflict или invalid.",
+        responses={
+            200: OpenApiResponse(description='Результаты по каждому элементу'),
+            400: OpenApiResponse(description='Неверный формат запроса'),
+        },
+        tags=['Бронирования']
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({"detail": "Ожидается непустой список бронирований"}, status=400)
+
+        if len(items) > BULK_MAX_BOOKINGS:
+            return Response({"detail": f"Можно создать не более {BULK_MAX_BOOKINGS} бронирований за раз"}, status=400)
+
+        results = create_bookings(request.user, items)
+        created = sum(1 for result in results if result['status'] == 'created')
+        return Response({"created": created, "results": results}, status=200)
+
     @extend_schema(
         summary="Отмена бронирования",
         description="Пользователель отменяет бронирование. Статус меняется с 'pending' на 'cancelled'.",
@@ -212,9 +526,9 @@ class BookingViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Бронь уже завершена"}, status=400)
 
         booking.status = BookingStatus.CANCELLED
-        booking.save()
+        booking.save(update_fields=['status'])
 
-        ActivityLog.objects.create(
+        log_activity(
             user=request.user,
             action='Отменил бронирование',
             content_object=booking
@@ -224,18 +538,50 @@ class BookingViewSet(viewsets.ModelViewSet):
 
     @extend_schema(
         summary="Проверка своих бронировании",
-        description="Возвращает список бронировании, разделенных по статусу",
+        description="Возвращает список бронировании, разделенных по статусу. "
+                    "Все брони читаются одним запросом.",
+        parameters=[
+            OpenApiParameter(name='limit', description='Не более N броней в каждом статусе', required=False,
+                             type=int),
+            OpenApiParameter(name='since', description='Завершённые и отменённые брони начиная с даты YYYY-MM-DD',
+                             required=False, type=str),
+        ],
         tags=['Бронирования']
     )
     @action(detail=False, methods=['get'], url_path='my')
     def my(self, request):
-        bookings = self.get_queryset()
-
-        data = {}
-        for value, label in BookingStatus.choices:
-            booking_by_status = bookings.filter(status=value)
-            serializer = BookingSerializer(booking_by_status, many=True)
-            data[value] = serializer.data
+        limit_str = request.query_params.get('limit')
+        since_str = request.query_params.get('since')
+
+        bookings = Booking.objects.filter(user=request.user)
+
+        if since_str:
+            try:
+                since = datetime.strptime(since_str, '%Y-%m-%d').date()
+            except ValueError:
+                return Response({"error": "Неверный формат даты"}, status=400)
+            # Активные брони возвращаются всегда, архив - только начиная с since
+            bookings = bookings.filter(Q(status__in=Booking.get_active_statuses()) | Q(date__gte=since))
+
+        if limit_str:
+            try:
+                limit = int(limit_str)
+                if limit < 1:
+                    raise ValueError
+            except ValueError:
+                return Response({"error": "Неверное значение параметра 'limit'"}, status=400)
+            bookings = bookings.annotate(
+                position=Window(RowNumber(), partition_by='status', order_by=Booking._meta.ordering)
+            ).filter(position__lte=limit)
+
+        buckets = {value: [] for value in BookingStatus.values}
+        for booking in bookings:
+            buckets[booking.status].append(booking)
+
+        data = {
+            value: BookingSerializer(bucket, many=True).data
+            for value, bucket in buckets.items()
+        }
         return Response(data)
 
     @extend_schema(
@@ -259,9 +605,9 @@ class BookingViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Бронь не может быть подтверждена в текущем статусе"}, status=400)
 
         booking.status = BookingStatus.CONFIRMED
-        booking.save()
+        booking.save(update_fields=['status'])
 
-        ActivityLog.objects.create(
+        log_activity(
             user=request.user,
             action='Подтвердил бронирование',
             content_object=booking
@@ -290,9 +636,9 @@ class BookingViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Бронь не может быть подтверждена в текущем статусе"}, status=400)
 
         booking.status = BookingStatus.COMPLETED
-        booking.save()
+        booking.save(update_fields=['status'])
 
-        ActivityLog.objects.create(
+        log_activity(
             user=request.user,
             action='Завершил бронирование',
             content_object=booking
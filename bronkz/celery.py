@@ -1,7 +1,27 @@
 import os
+import time
 from celery import Celery
+from celery.signals import task_prerun, task_postrun
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bronkz.settings')
 app = Celery('bronkz')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
+
+
+_task_started = {}
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def record_task_metrics(task_id=None, task=None, state=None, **kwargs):
+    from .metrics import TASK_OUTCOMES, TASK_RUNTIME
+
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_RUNTIME.observe(time.perf_counter() - started, task=task.name)
+    TASK_OUTCOMES.inc(task=task.name, outcome=(state or 'unknown').lower())
@@ -0,0 +1,74 @@
+import re
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LIST_RE = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Нормализует SQL: литералы и списки IN разной длины дают один отпечаток."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _LIST_RE.sub('(...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryCollector:
+    """
+    Обёртка для connection.execute_wrapper: считает запросы, время в БД,
+    затронутые строки (rowcount) и повторяющиеся запросы по отпечаткам.
+    При превышении threshold запоминает стек кода проекта, выполнившего
+    первый лишний запрос.
+    """
+
+    def __init__(self, threshold=None):
+        self.queries = 0
+        self.duration = 0.0
+        self.rows = 0
+        self.fingerprints = Counter()
+        self.threshold = threshold
+        self.stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+            if self.threshold is not None and self.queries == self.threshold + 1:
+                self.stack = project_stack()
+            rowcount = getattr(context['cursor'], 'rowcount', -1)
+            if rowcount and rowcount > 0:
+                self.rows += rowcount
+
+    @property
+    def duplicates(self):
+        return {sql: count for sql, count in self.fingerprints.most_common() if count > 1}
+
+
+def project_stack():
+    """Кадры стека из кода проекта, без Django и сторонних библиотек."""
+    base_dir = str(settings.BASE_DIR)
+    return [
+        f'{frame.filename}:{frame.lineno} in {frame.name}'
+        for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(base_dir) and 'site-packages' not in frame.filename
+    ]
+
+
+@contextmanager
+def collect_queries(using='default', threshold=None):
+    collector = QueryCollector(threshold)
+    with connections[using].execute_wrapper(collector):
+        yield collector
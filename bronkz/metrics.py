@@ -0,0 +1,233 @@
+"""
+Встроенный реестр метрик с выводом в текстовом формате Prometheus.
+
+Каждый процесс копит значения в памяти. Если задан METRICS_DIR, процесс
+периодически сбрасывает снимок в свой файл metrics_<host>_<pid>.json, а /metrics
+суммирует файлы всех процессов (воркеры gunicorn и Celery). Снимки, которые
+не обновлялись несколько интервалов сброса, остались от завершённых процессов
+и удаляются при сборе.
+Гистограммы хранят накопительные бакеты, поэтому сложение снимков корректно.
+"""
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Через сколько интервалов сброса снимок процесса считается брошенным
+STALE_FLUSH_INTERVALS = 3
+
+logger = logging.getLogger(__name__)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.samples = defaultdict(float)
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.hostname = socket.gethostname()
+        self.last_flush = 0.0
+        self.flusher_pid = None
+        # Номер последнего снимка и последнего записанного в файл
+        self.snapshot_seq = 0
+        self.written_seq = 0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add(self, updates):
+        with self.lock:
+            # После fork потомок не должен повторно отдавать значения родителя
+            if self.pid != os.getpid():
+                self.samples.clear()
+                self.pid = os.getpid()
+                self.last_flush = 0.0
+            for key, amount in updates:
+                self.samples[key] += amount
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        if not settings.METRICS_DIR:
+            return
+        # Фоновый поток обновляет снимок и у простаивающего процесса,
+        # иначе его значения пропадали бы из суммы как устаревшие
+        if self.flusher_pid != os.getpid():
+            self.flusher_pid = os.getpid()
+            threading.Thread(target=self.flush_periodically, daemon=True).start()
+        if time.monotonic() - self.last_flush >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush_periodically(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            if settings.METRICS_DIR:
+                self.flush()
+
+    def flush(self):
+        """
+        Записывает снимок процесса. Сброс идёт и из фонового потока, и из запросов:
+        каждый пишет в свой временный файл, а более старый снимок не заменяет
+        уже записанный новый. Ошибка записи не должна ронять запрос.
+        """
+        directory = Path(settings.METRICS_DIR)
+        with self.lock:
+            self.last_flush = time.monotonic()
+            self.snapshot_seq += 1
+            seq = self.snapshot_seq
+            snapshot = [[name, suffix, list(labels), value] for (name, suffix, labels), value in self.samples.items()]
+            path = directory / f'metrics_{self.hostname}_{self.pid}.json'
+
+        tmp_name = None
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as tmp:
+                tmp_name = tmp.name
+                tmp.write(json.dumps(snapshot))
+            with self.lock:
+                if seq > self.written_seq:
+                    os.replace(tmp_name, path)
+                    self.written_seq = seq
+                    tmp_name = None
+        except OSError:
+            logger.exception('Не удалось записать снимок метрик в %s', directory)
+        finally:
+            if tmp_name:
+                Path(tmp_name).unlink(missing_ok=True)
+
+    def collect(self):
+        """Значения всех процессов: из файлов METRICS_DIR или только текущего процесса."""
+        if not settings.METRICS_DIR:
+            with self.lock:
+                return dict(self.samples)
+
+        self.flush()
+        samples = defaultdict(float)
+        stale_before = time.time() - settings.METRICS_FLUSH_INTERVAL * STALE_FLUSH_INTERVALS
+        for path in Path(settings.METRICS_DIR).glob('metrics_*.json'):
+            try:
+                if path.stat().st_mtime < stale_before:
+                    path.unlink(missing_ok=True)
+                    continue
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for name, suffix, labels, value in snapshot:
+                samples[name, suffix, tuple(tuple(pair) for pair in labels)] += value
+        return samples
+
+    def render(self):
+        by_metric = defaultdict(list)
+        for (name, suffix, labels), value in self.collect().items():
+            by_metric[name].append((suffix, labels, value))
+
+        lines = []
+        for name in sorted(by_metric):
+            metric = self.metrics.get(name)
+            if metric is None:
+                continue
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for suffix, labels, value in sorted(by_metric[name], key=metric.sort_key):
+                lines.append(f'{name}{suffix}{format_labels(labels)} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels) + '}'
+
+
+def format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry
+        registry.register(self)
+
+    def label_pairs(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name}: ожидаются метки {self.labelnames}, получены {tuple(labels)}')
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def sort_key(self, sample):
+        suffix, labels, _ = sample
+        return labels, suffix
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        self.registry.add([((self.name, '_total', self.label_pairs(labels)), amount)])
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        pairs = self.label_pairs(labels)
+        updates = [
+            ((self.name, '_bucket', pairs + (('le', format_value(float(bound))),)), 1)
+            for bound in self.buckets if value <= bound
+        ]
+        updates += [
+            ((self.name, '_bucket', pairs + (('le', '+Inf'),)), 1),
+            ((self.name, '_sum', pairs), value),
+            ((self.name, '_count', pairs), 1),
+        ]
+        self.registry.add(updates)
+
+    def sort_key(self, sample):
+        suffix, labels, _ = sample
+        base = tuple(pair for pair in labels if pair[0] != 'le')
+        le = dict(labels).get('le')
+        bound = float('inf') if le in (None, '+Inf') else float(le)
+        return base, suffix != '_bucket', bound, suffix
+
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Время обработки HTTP-запроса', ['view', 'method', 'status']
+)
+REQUEST_DB_TIME = Histogram(
+    'http_request_db_seconds', 'Время SQL-запросов за HTTP-запрос', ['view']
+)
+CACHE_REQUESTS = Counter(
+    'availability_cache_requests', 'Обращения к кэшу доступности', ['result']
+)
+TASK_RUNTIME = Histogram(
+    'celery_task_duration_seconds', 'Время выполнения задачи Celery', ['task'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+TASK_OUTCOMES = Counter(
+    'celery_tasks', 'Завершённые задачи Celery по результату', ['task', 'outcome']
+)
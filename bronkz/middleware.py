@@ -0,0 +1,63 @@
+import json
+import logging
+import time
+
+from django.conf import settings
+
+from .instrumentation import collect_queries
+from .metrics import REQUEST_DB_TIME, REQUEST_LATENCY
+
+
+logger = logging.getLogger('bronkz.sql')
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Считает SQL-запросы запроса, время в БД и повторы, отдаёт их в заголовке
+    Server-Timing, пишет структурированную строку в лог и метрики латентности. Если запросов больше
+    SQL_QUERY_THRESHOLD, в лог (WARNING) попадают view и стек первого лишнего запроса.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = settings.SQL_QUERY_THRESHOLD
+        start = time.perf_counter()
+        with collect_queries(threshold=threshold) as collector:
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        duplicates = collector.duplicates
+        repeated = sum(duplicates.values()) - len(duplicates)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={collector.duration * 1000:.1f};desc="{collector.queries} queries"',
+            f'db-dup;desc="{repeated} repeated"',
+            f'app;dur={total * 1000:.1f}',
+        ])
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        REQUEST_LATENCY.observe(total, view=view, method=request.method, status=response.status_code)
+        REQUEST_DB_TIME.observe(collector.duration, view=view)
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(total * 1000, 1),
+            'db_ms': round(collector.duration * 1000, 1),
+            'queries': collector.queries,
+            'repeated_queries': repeated,
+        }
+
+        if collector.queries > threshold:
+            record['threshold'] = threshold
+            record['stack'] = collector.stack
+            record['top_duplicates'] = dict(list(duplicates.items())[:5])
+            logger.warning(json.dumps(record, ensure_ascii=False))
+        else:
+            logger.info(json.dumps(record, ensure_ascii=False))
+
+        return response
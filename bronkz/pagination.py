@@ -0,0 +1,114 @@
+import base64
+import json
+from datetime import date, datetime, time
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничная навигация по ключу (keyset). Следующая страница выбирается
+    условием по значениям полей ordering последней строки, без OFFSET и COUNT.
+    Последним полем ordering должно быть уникальное поле (обычно id).
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = "Неверный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.fields = [
+            (queryset.model._meta.get_field(name.lstrip('-')), name.startswith('-'))
+            for name in self.ordering
+        ]
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.get_cursor_filter(self.decode_cursor(cursor)))
+
+        page_size = self.get_page_size(request)
+        results = list(queryset[:page_size + 1])
+        self.next_position = self.get_position(results[page_size - 1]) if len(results) > page_size else None
+        return results[:page_size]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_position(self, obj):
+        return [getattr(obj, field.attname) for field, _ in self.fields]
+
+    def get_cursor_filter(self, position):
+        # (a, b, c) после (x, y, z): a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        lookup = Q()
+        equal = {}
+        for (field, descending), value in zip(self.fields, position):
+            operator = 'lt' if descending else 'gt'
+            lookup |= Q(**equal, **{f'{field.attname}__{operator}': value})
+            equal[field.attname] = value
+        return lookup
+
+    def encode_cursor(self, position):
+        values = [value.isoformat() if isinstance(value, (date, datetime, time)) else value for value in position]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [field.to_python(value) for (field, _), value in zip(self.fields, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор следующей страницы',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Размер страницы (не больше {self.max_page_size})',
+                'schema': {'type': 'integer'},
+            },
+        ]
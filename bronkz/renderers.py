@@ -0,0 +1,54 @@
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# Типы, которых нет в JSON и MessagePack (даты, Decimal, UUID, ленивые строки),
+# приводятся так же, как у стандартного JSONRenderer
+encode_default = JSONEncoder().default
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson. Даты, Decimal и UUID передаются кодировщику DRF,
+    поэтому значения совпадают со стандартным рендерером, но байты — не всегда:
+    - большие и маленькие float записываются без «+» и ведущего нуля в порядке
+      (1e16 вместо 1e+16, 1.5e-7 вместо 1.5e-07), число при разборе то же;
+    - NaN и бесконечность становятся null, тогда как JSONRenderer падает с ValueError;
+    - целые за пределами 64 бит orjson не кодирует, такие ответы целиком
+      отрисовывает стандартный рендерер.
+    U+2028 и U+2029 экранируются, как в JSONRenderer: иначе JSON, вставленный
+    в JavaScript, ломает строковые литералы.
+    Отступ orjson поддерживает только в 2 пробела, поэтому любой запрошенный indent даёт 2.
+    """
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = self.options
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        try:
+            content = orjson.dumps(data, default=encode_default, option=options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return content.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Бинарный формат для внутренних сервисов, выбирается заголовком Accept: application/msgpack."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default)
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'users',
     'booking',
@@ -52,10 +53,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'bronkz.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'logs.middleware.ActivityLogMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -117,10 +120,23 @@ AUTH_USER_MODEL = 'users.CustomUser'
 
 APPEND_SLASH = True
 
+# JSON через orjson (FAST_JSON=true); по умолчанию стандартные JSONRenderer/JSONParser
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true"
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'bronkz.renderers.ORJSONRenderer' if FAST_JSON else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'bronkz.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'bronkz.parsers.ORJSONParser' if FAST_JSON else 'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
@@ -174,6 +190,42 @@ EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")
 
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.getenv("REDIS_CACHE_URL", os.getenv("REDIS_URL")),
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'IGNORE_EXCEPTIONS': True,
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Записи ActivityLog пишутся пачкой после коммита; при true - через Celery
+ACTIVITY_LOG_ASYNC = os.getenv("ACTIVITY_LOG_ASYNC", "false").lower() == "true"
+
+# Сколько SQL-запросов на один HTTP-запрос считается нормой; сверх этого в лог пишется стек
+SQL_QUERY_THRESHOLD = int(os.getenv("SQL_QUERY_THRESHOLD", 30))
+
+# Каталог снимков метрик процессов для /metrics; без него отдаются метрики только текущего процесса
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = 5
+# Адреса, с которых доступен /metrics (Prometheus); остальным нужен вход сотрудника.
+# За прокси REMOTE_ADDR — адрес прокси, поэтому там /metrics закрывается на самом прокси
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()]
+
+# Помесячные секции ActivityLog: сколько создавать заранее и сколько хранить до архивации
+ACTIVITY_LOG_PARTITIONS_AHEAD = 3
+ACTIVITY_LOG_RETENTION_MONTHS = int(os.getenv("ACTIVITY_LOG_RETENTION_MONTHS", 12))
+ACTIVITY_LOG_ARCHIVE_DIR = Path(os.getenv("ACTIVITY_LOG_ARCHIVE_DIR", BASE_DIR / 'archive' / 'activity_log'))
+
 CELERY_BROKER_URL = os.getenv("REDIS_URL")
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 
@@ -182,5 +234,13 @@ CELERY_BEAT_SCHEDULE = {
     "auto_complete_bookings": {
         "task": "booking.tasks.auto_complete_bookings",
         "schedule": crontab(minute='*/5')
+    },
+    "rollup_place_daily_stats": {
+        "task": "booking.tasks.rollup_place_daily_stats",
+        "schedule": crontab(minute='*/15')
+    },
+    "maintain_activity_log_partitions": {
+        "task": "logs.tasks.maintain_activity_log_partitions",
+        "schedule": crontab(hour=3, minute=0)
     }
 }
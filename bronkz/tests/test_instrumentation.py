@@ -0,0 +1,54 @@
+import json
+from datetime import time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from booking.models import Place
+from bronkz.instrumentation import collect_queries, fingerprint
+
+
+class FingerprintTest(TestCase):
+    def test_literals_and_in_lists_are_normalized(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'a''b' LIMIT 21"),
+            fingerprint("SELECT *  FROM t WHERE id IN (%s, %s) AND name = 'c' LIMIT 5"),
+        )
+
+    def test_collector_counts_duplicates_and_rows(self):
+        for i in range(3):
+            Place.objects.create(name=f'place {i}', open_time=time(8), close_time=time(20))
+
+        with collect_queries() as collector:
+            for place in Place.objects.all():
+                Place.objects.filter(pk=place.pk).exists()
+
+        self.assertEqual(collector.queries, 4)
+        self.assertEqual(collector.rows, 6)
+        self.assertEqual(list(collector.duplicates.values()), [3])
+
+
+class QueryInstrumentationMiddlewareTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_header(self):
+        with self.assertLogs('bronkz.sql', level='INFO') as logs:
+            response = self.client.get('/api/users/me/')
+
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="1 queries", db-dup;desc="0 repeated", app;dur=')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'users-me')
+        self.assertEqual(record['queries'], 1)
+
+    @override_settings(SQL_QUERY_THRESHOLD=0)
+    def test_threshold_logs_view_and_stack(self):
+        with self.assertLogs('bronkz.sql', level='WARNING') as logs:
+            self.client.get('/api/users/me/')
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['threshold'], 0)
+        self.assertTrue(any('users/views.py' in frame for frame in record['stack']))
@@ -0,0 +1,113 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bronkz.metrics import Counter, Histogram, Registry
+from logs.tasks import write_activity_logs
+
+
+class RegistryTest(TestCase):
+    def setUp(self):
+        self.registry = Registry()
+        self.requests = Counter('requests', 'Запросы', ['view'], registry=self.registry)
+        self.latency = Histogram('latency_seconds', 'Латентность', ['view'], buckets=(0.1, 1), registry=self.registry)
+
+    def test_prometheus_text_format(self):
+        self.requests.inc(view='a"b')
+        self.requests.inc(2, view='a"b')
+        self.latency.observe(0.05, view='x')
+        self.latency.observe(0.5, view='x')
+
+        self.assertEqual(self.registry.render(), '\n'.join([
+            '# HELP latency_seconds Латентность',
+            '# TYPE latency_seconds histogram',
+            'latency_seconds_bucket{view="x",le="0.1"} 1',
+            'latency_seconds_bucket{view="x",le="1"} 2',
+            'latency_seconds_bucket{view="x",le="+Inf"} 2',
+            'latency_seconds_count{view="x"} 2',
+            'latency_seconds_sum{view="x"} 0.55',
+            '# HELP requests Запросы',
+            '# TYPE requests counter',
+            'requests_total{view="a\\"b"} 3',
+        ]) + '\n')
+
+    def test_labels_must_match(self):
+        with self.assertRaises(ValueError):
+            self.requests.inc(path='/')
+
+    def test_snapshots_of_all_processes_are_summed(self):
+        directory = tempfile.mkdtemp()
+        with open(f'{directory}/metrics_other-host_{os.getpid()}.json', 'w') as snapshot:
+            json.dump([['requests', '_total', [['view', 'a']], 4]], snapshot)
+
+        with override_settings(METRICS_DIR=directory):
+            self.requests.inc(view='a')
+            self.assertIn('requests_total{view="a"} 5', self.registry.render())
+        self.assertTrue(os.path.exists(f'{directory}/metrics_{socket.gethostname()}_{os.getpid()}.json'))
+
+    def test_stale_snapshots_are_removed(self):
+        directory = tempfile.mkdtemp()
+        path = f'{directory}/metrics_other-host_1.json'
+        with open(path, 'w') as snapshot:
+            json.dump([['requests', '_total', [['view', 'a']], 4]], snapshot)
+        # Процесс не обновлял снимок дольше трёх интервалов сброса
+        stale = time.time() - 60
+        os.utime(path, (stale, stale))
+
+        with override_settings(METRICS_DIR=directory, METRICS_FLUSH_INTERVAL=5):
+            self.requests.inc(view='a')
+            self.assertIn('requests_total{view="a"} 1', self.registry.render())
+        self.assertFalse(os.path.exists(path))
+
+    def test_concurrent_flushes(self):
+        directory = tempfile.mkdtemp()
+        with override_settings(METRICS_DIR=directory):
+            self.requests.inc(view='a')
+            threads = [threading.Thread(target=self.registry.flush) for _ in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(os.listdir(directory), [f'metrics_{socket.gethostname()}_{os.getpid()}.json'])
+            self.assertIn('requests_total{view="a"} 1', self.registry.render())
+
+    def test_write_errors_are_not_raised(self):
+        # Вместо каталога — файл: записать снимок невозможно
+        with tempfile.NamedTemporaryFile() as file, override_settings(METRICS_DIR=file.name):
+            with self.assertLogs('bronkz.metrics', 'ERROR'):
+                self.requests.inc(view='a')
+
+
+class MetricsEndpointTest(TestCase):
+    def test_exports_request_and_task_metrics(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username='testuser', password='1234'))
+        client.get('/api/users/me/')
+        write_activity_logs.apply(args=[[]])
+
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{view="users-me",method="GET",status="200"}', body)
+        self.assertIn('celery_tasks_total{task="logs.tasks.write_activity_logs",outcome="success"}', body)
+        self.assertIn('celery_task_duration_seconds_count{task="logs.tasks.write_activity_logs"}', body)
+
+    def test_access_is_restricted(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.5').status_code, 403)
+
+        with override_settings(METRICS_ALLOWED_IPS=['203.0.113.5']):
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.5').status_code, 200)
+
+        staff = get_user_model().objects.create_user(username='admin', password='1234', is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.5').status_code, 200)
@@ -0,0 +1,117 @@
+import json
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from io import BytesIO
+
+import msgpack
+from django.test import TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from booking.models import Place
+from bronkz.parsers import ORJSONParser
+from bronkz.renderers import MessagePackRenderer, ORJSONRenderer
+
+
+PAYLOAD = {
+    'created_at': datetime(2030, 1, 10, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    'date': date(2030, 1, 10),
+    'start_time': time(10, 30),
+    'price': Decimal('12.50'),
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'label': gettext_lazy('Залы'),
+    'slots': {1: [True, False], 2: None},
+    'ratio': 0.1,
+}
+
+
+class ORJSONRendererTest(TestCase):
+    def test_output_matches_json_renderer(self):
+        self.assertEqual(ORJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD))
+
+    def test_float_exponent_format(self):
+        data = {'big': 1e16, 'small': 1.5e-7}
+
+        content = ORJSONRenderer().render(data)
+
+        # Запись порядка отличается от json.dumps, значения — нет
+        self.assertEqual(content, b'{"big":1e16,"small":1.5e-7}')
+        self.assertEqual(json.loads(content), json.loads(JSONRenderer().render(data)))
+
+    def test_non_finite_floats_become_null(self):
+        self.assertEqual(ORJSONRenderer().render({'a': float('nan'), 'b': float('inf')}), b'{"a":null,"b":null}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'a': float('nan')})
+
+    def test_integer_beyond_64_bits_falls_back(self):
+        data = {'a': 2 ** 70, 'date': date(2030, 1, 10)}
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_escapes_line_separators(self):
+        data = {'bio': 'строка\u2028абзац\u2029конец'}
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertIn(b'\\u2028', ORJSONRenderer().render(data))
+
+    def test_indent(self):
+        content = ORJSONRenderer().render({'a': [1]}, 'application/json; indent=4')
+
+        self.assertEqual(content, b'{\n  "a": [\n    1\n  ]\n}')
+
+    def test_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_parser(self):
+        parser = ORJSONParser()
+
+        self.assertEqual(parser.parse(BytesIO('{"name": "Зал"}'.encode())), {'name': 'Зал'})
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b'{"name": NaN}'))
+
+
+class MessagePackRendererTest(TestCase):
+    def test_encodes_like_json(self):
+        content = MessagePackRenderer().render(PAYLOAD)
+
+        expected = json.loads(JSONRenderer().render(PAYLOAD))
+        expected['slots'] = {1: [True, False], 2: None}
+        self.assertEqual(msgpack.unpackb(content, strict_map_key=False), expected)
+
+    def test_content_negotiation(self):
+        Place.objects.create(name='Зал', bio='', location='', open_time=time(8), close_time=time(20))
+        client = APIClient()
+
+        response = client.get('/api/places/', HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), client.get('/api/places/').json())
+
+    def test_etag_depends_on_format(self):
+        Place.objects.create(name='Зал', bio='', location='', open_time=time(8), close_time=time(20))
+        client = APIClient()
+
+        json_response = client.get('/api/places/')
+        msgpack_response = client.get('/api/places/', HTTP_ACCEPT='application/msgpack')
+
+        self.assertNotEqual(json_response['ETag'], msgpack_response['ETag'])
+        self.assertIn('Accept', msgpack_response['Vary'])
+        response = client.get(
+            '/api/places/', HTTP_ACCEPT='application/msgpack', HTTP_IF_NONE_MATCH=json_response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        response = client.get('/api/places/', HTTP_IF_NONE_MATCH=json_response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('Accept', response['Vary'])
+
+    def test_json_request_body(self):
+        client = APIClient()
+
+        response = client.post('/api/token/', '{"username": 1', content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
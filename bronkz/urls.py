@@ -3,6 +3,8 @@ from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from .views import metrics
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -15,4 +17,7 @@ urlpatterns = [
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
 
     path('api/users/', include('users.urls')),
+    path('api/logs/', include('logs.urls')),
+
+    path('metrics', metrics, name='metrics'),
 ]
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .metrics import CONTENT_TYPE, REGISTRY
+
+
+def metrics(request):
+    """
+    Метрики всех процессов в текстовом формате Prometheus. Счётчики раскрывают
+    внутреннее устройство сервиса, поэтому доступ только с METRICS_ALLOWED_IPS
+    или для сотрудников.
+    """
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS and not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
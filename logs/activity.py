@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ActivityLog
+
+
+_buffer = ContextVar('activity_log_buffer', default=None)
+
+
+def log_activity(user, action, content_object=None):
+    """
+    Регистрирует запись журнала. Запись попадает в буфер только после фиксации
+    текущей транзакции, поэтому откаченные изменения не оставляют следов в журнале.
+    Буфер сбрасывается одним bulk_create в конце запроса (ActivityLogMiddleware),
+    вне запроса - сразу после коммита.
+    """
+    entry = ActivityLog(
+        user=user,
+        action=action,
+        content_object=content_object,
+        created_at=timezone.now()
+    )
+    transaction.on_commit(lambda: _enqueue(entry))
+
+
+def _enqueue(entry):
+    buffer = _buffer.get()
+    if buffer is None:
+        flush([entry])
+    else:
+        buffer.append(entry)
+
+
+def flush(entries):
+    if not entries:
+        return
+
+    if settings.ACTIVITY_LOG_ASYNC:
+        from .tasks import write_activity_logs
+
+        write_activity_logs.delay([
+            {
+                'user_id': entry.user_id,
+                'action': entry.action,
+                'content_type_id': entry.content_type_id,
+                'object_id': entry.object_id,
+                'created_at': entry.created_at.isoformat(),
+            }
+            for entry in entries
+        ])
+    else:
+        ActivityLog.objects.bulk_create(entries)
+
+
+@contextmanager
+def buffered_activity_log():
+    token = _buffer.set([])
+    try:
+        yield
+    finally:
+        entries = _buffer.get()
+        _buffer.reset(token)
+        flush(entries)
@@ -7,3 +7,4 @@ class ActivityLogAdmin(admin.ModelAdmin):
     list_display = ('user', 'action', 'content_type', 'object_id', 'created_at')
     list_filter = ('action', 'content_type', 'created_at')
     search_fields = ('user__username', 'action')
+    show_full_result_count = False
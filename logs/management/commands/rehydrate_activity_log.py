@@ -0,0 +1,102 @@
+import gzip
+import json
+from datetime import date, datetime
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from logs.models import ActivityLog
+from logs.partitions import PARTITION_RE, create_partition, list_partitions, mark_rehydrated, release_partition
+
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Восстанавливает архивную секцию ActivityLog из JSONL-архива для расследований. '
+        'Восстановленная секция не архивируется повторно, пока её не отпустят через --release.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archive', type=Path, nargs='?', help='Путь к файлу logs_activitylog_pYYYYMM.jsonl.gz')
+        parser.add_argument('--release', metavar='YYYY-MM',
+                            help='Снять отметку с восстановленной секции, чтобы задача хранения снова её архивировала')
+
+    def handle(self, *args, **options):
+        if options['release']:
+            return self.release(options['release'])
+
+        path = options['archive']
+        if path is None:
+            raise CommandError('Укажите путь к архиву или --release YYYY-MM')
+        if not path.exists():
+            raise CommandError(f'Файл {path} не найден')
+
+        match = PARTITION_RE.match(path.name.removesuffix('.jsonl.gz'))
+        if not match:
+            raise CommandError('Имя архива должно иметь вид logs_activitylog_pYYYYMM.jsonl.gz')
+
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if month in list_partitions():
+            raise CommandError(f'Секция за {month:%Y-%m} уже подключена')
+
+        restored = 0
+        with transaction.atomic():
+            create_partition(month)
+            mark_rehydrated(month)
+            with gzip.open(path, 'rt', encoding='utf-8') as archive:
+                batch = []
+                for line in archive:
+                    batch.append(json.loads(line))
+                    if len(batch) >= BATCH_SIZE:
+                        restored += self.restore(batch)
+                        batch = []
+                restored += self.restore(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Восстановлено {restored} записей за {month:%Y-%m}. '
+            f'Секция не архивируется до запуска с --release {month:%Y-%m}.'
+        ))
+
+    def release(self, value):
+        try:
+            month = datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError('Месяц указывается в формате YYYY-MM')
+        if month not in list_partitions():
+            raise CommandError(f'Секция за {month:%Y-%m} не подключена')
+
+        release_partition(month)
+        self.stdout.write(self.style.SUCCESS(
+            f'Секция за {month:%Y-%m} будет архивирована при следующем запуске задачи хранения.'
+        ))
+
+    def restore(self, records):
+        if not records:
+            return 0
+
+        # Удалённые пользователи и типы контента обнуляются, как при on_delete=SET_NULL
+        user_ids = set(get_user_model().objects.filter(
+            pk__in={record['user_id'] for record in records}
+        ).values_list('pk', flat=True))
+        content_type_ids = set(ContentType.objects.filter(
+            pk__in={record['content_type_id'] for record in records}
+        ).values_list('pk', flat=True))
+
+        ActivityLog.objects.bulk_create([
+            ActivityLog(
+                id=record['id'],
+                user_id=record['user_id'] if record['user_id'] in user_ids else None,
+                action=record['action'],
+                content_type_id=record['content_type_id'] if record['content_type_id'] in content_type_ids else None,
+                object_id=record['object_id'],
+                created_at=parse_datetime(record['created_at'])
+            )
+            for record in records
+        ])
+        return len(records)
@@ -0,0 +1,12 @@
+from .activity import buffered_activity_log
+
+
+class ActivityLogMiddleware:
+    """Собирает записи журнала за время запроса и пишет их одной вставкой."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with buffered_activity_log():
+            return self.get_response(request)
@@ -0,0 +1,119 @@
+from django.db import migrations
+
+
+TABLE = 'logs_activitylog'
+
+PARTITION_SQL = f"""
+ALTER TABLE {TABLE} RENAME TO {TABLE}_old;
+ALTER SEQUENCE {TABLE}_id_seq RENAME TO {TABLE}_old_id_seq;
+ALTER INDEX {TABLE}_pkey RENAME TO {TABLE}_old_pkey;
+ALTER INDEX {TABLE}_content_type_id_14813def RENAME TO {TABLE}_old_content_type_id;
+ALTER INDEX {TABLE}_user_id_b18d830f RENAME TO {TABLE}_old_user_id;
+
+CREATE SEQUENCE {TABLE}_id_seq;
+
+CREATE TABLE {TABLE} (
+    id bigint NOT NULL DEFAULT nextval('{TABLE}_id_seq'),
+    action varchar(255) NOT NULL,
+    object_id integer NULL CONSTRAINT {TABLE}_object_id_check CHECK (object_id >= 0),
+    created_at timestamp with time zone NOT NULL,
+    content_type_id integer NULL
+        CONSTRAINT {TABLE}_content_type_id_14813def_fk_django_co
+        REFERENCES django_content_type (id) DEFERRABLE INITIALLY DEFERRED,
+    user_id bigint NULL
+        CONSTRAINT {TABLE}_user_id_b18d830f_fk_users_customuser_id
+        REFERENCES users_customuser (id) DEFERRABLE INITIALLY DEFERRED,
+    CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id;
+
+CREATE INDEX {TABLE}_content_type_id_14813def ON {TABLE} (content_type_id);
+CREATE INDEX {TABLE}_user_id_b18d830f ON {TABLE} (user_id);
+
+CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT;
+"""
+
+UNPARTITION_SQL = f"""
+ALTER TABLE {TABLE} RENAME TO {TABLE}_partitioned;
+ALTER INDEX {TABLE}_pkey RENAME TO {TABLE}_partitioned_pkey;
+ALTER INDEX {TABLE}_content_type_id_14813def RENAME TO {TABLE}_partitioned_content_type_id;
+ALTER INDEX {TABLE}_user_id_b18d830f RENAME TO {TABLE}_partitioned_user_id;
+
+CREATE TABLE {TABLE} (
+    id bigint NOT NULL GENERATED BY DEFAULT AS IDENTITY CONSTRAINT {TABLE}_pkey PRIMARY KEY,
+    action varchar(255) NOT NULL,
+    object_id integer NULL CHECK (object_id >= 0),
+    created_at timestamp with time zone NOT NULL,
+    content_type_id integer NULL
+        REFERENCES django_content_type (id) DEFERRABLE INITIALLY DEFERRED,
+    user_id bigint NULL
+        REFERENCES users_customuser (id) DEFERRABLE INITIALLY DEFERRED
+);
+
+INSERT INTO {TABLE} SELECT id, action, object_id, created_at, content_type_id, user_id FROM {TABLE}_partitioned;
+SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {TABLE};
+
+CREATE INDEX {TABLE}_content_type_id_14813def ON {TABLE} (content_type_id);
+CREATE INDEX {TABLE}_user_id_b18d830f ON {TABLE} (user_id);
+
+DROP TABLE {TABLE}_partitioned CASCADE;
+"""
+
+
+def month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_month(value):
+    return value.replace(year=value.year + value.month // 12, month=value.month % 12 + 1)
+
+
+def partition_activity_log(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    from django.utils import timezone
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(PARTITION_SQL)
+
+        cursor.execute(f'SELECT MIN(created_at) FROM {TABLE}_old')
+        first, = cursor.fetchone()
+        month = month_start(first or timezone.now())
+        last = add_month(add_month(add_month(month_start(timezone.now()))))
+        while month <= last:
+            end = add_month(month)
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{month:%Y%m} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{month.date().isoformat()}') TO ('{end.date().isoformat()}')"
+            )
+            month = end
+
+        cursor.execute(
+            f'INSERT INTO {TABLE} (id, action, object_id, created_at, content_type_id, user_id) '
+            f'SELECT id, action, object_id, created_at, content_type_id, user_id FROM {TABLE}_old'
+        )
+        cursor.execute(f"SELECT setval('{TABLE}_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM {TABLE}_old")
+        cursor.execute(f'DROP TABLE {TABLE}_old')
+
+
+def unpartition_activity_log(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(UNPARTITION_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logs', '0002_alter_activitylog_created_at'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('users', '0002_customuser_role'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_activity_log, unpartition_activity_log),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('logs', '0004_activitylog_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['user', 'created_at'], name='activitylog_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['content_type', 'object_id', 'created_at'], name='activitylog_object_created_idx'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.conf import settings
+from django.utils import timezone
 
 
 class ActivityLog(models.Model):
@@ -12,10 +13,16 @@ class ActivityLog(models.Model):
     object_id = models.PositiveIntegerField(null=True)
     content_object = GenericForeignKey('content_type', 'object_id')
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['-created_at']
+        # Таблица секционирована по месяцам created_at (см. миграцию 0003 и logs.partitions)
+        indexes = [
+            models.Index(fields=['-created_at'], name='activitylog_created_idx'),
+            models.Index(fields=['user', 'created_at'], name='activitylog_user_created_idx'),
+            models.Index(fields=['content_type', 'object_id', 'created_at'], name='activitylog_object_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user} {self.action} {self.content_type} {self.object_id}'
@@ -0,0 +1,7 @@
+from bronkz.pagination import KeysetPagination
+
+
+class ActivityLogPagination(KeysetPagination):
+    page_size = 50
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,167 @@
+import gzip
+import json
+import re
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ActivityLog
+
+
+TABLE = ActivityLog._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+PARTITION_RE = re.compile(rf'^{TABLE}_p(\d{{4}})(\d{{2}})$')
+REHYDRATED_MARK = 'rehydrated'
+COLUMNS = ('id', 'user_id', 'action', 'content_type_id', 'object_id', 'created_at')
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y%m}'
+
+
+def list_partitions():
+    """Месячные секции журнала: {первое число месяца: имя таблицы}."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [TABLE]
+        )
+        names = [name for name, in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        match = PARTITION_RE.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+def create_partition(month):
+    """
+    Создаёт секцию за месяц. Строки этого месяца, успевшие попасть в секцию
+    по умолчанию, переносятся в новую секцию до её подключения.
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS {name} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= %s AND created_at < %s RETURNING *) '
+            f'INSERT INTO {name} SELECT * FROM moved',
+            [start, end]
+        )
+        cursor.execute(f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')")
+    return name
+
+
+def ensure_partitions(months_ahead=None):
+    """Создаёт недостающие секции с текущего месяца на months_ahead месяцев вперёд."""
+    if months_ahead is None:
+        months_ahead = settings.ACTIVITY_LOG_PARTITIONS_AHEAD
+
+    existing = list_partitions()
+    current = month_start(timezone.localdate())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month not in existing:
+            created.append(create_partition(month))
+    return created
+
+
+def archive_path(month):
+    return settings.ACTIVITY_LOG_ARCHIVE_DIR / f'{partition_name(month)}.jsonl.gz'
+
+
+def rehydrated_partitions():
+    """Месяцы секций, восстановленных из архива и ещё не отпущенных release_partition."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s AND obj_description(child.oid, 'pg_class') = %s
+            """,
+            [TABLE, REHYDRATED_MARK]
+        )
+        names = {name for name, in cursor.fetchall()}
+    return {month for month, name in list_partitions().items() if name in names}
+
+
+def mark_rehydrated(month):
+    """Исключает секцию из архивации, пока её не отпустят release_partition."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"COMMENT ON TABLE {partition_name(month)} IS '{REHYDRATED_MARK}'")
+
+
+def release_partition(month):
+    with connection.cursor() as cursor:
+        cursor.execute(f'COMMENT ON TABLE {partition_name(month)} IS NULL')
+
+
+def dump_partition(name, path):
+    tmp_path = path.with_suffix('.tmp')
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as archive, connection.cursor() as cursor:
+        cursor.execute(f'SELECT {", ".join(COLUMNS)} FROM {name} ORDER BY id')
+        while rows := cursor.fetchmany(1000):
+            for row in rows:
+                record = dict(zip(COLUMNS, row))
+                record['created_at'] = record['created_at'].isoformat()
+                archive.write(json.dumps(record, ensure_ascii=False) + '\n')
+    tmp_path.replace(path)
+
+
+def archive_partitions(retention_months=None):
+    """
+    Выгружает секции старше срока хранения в сжатый JSONL, затем в одной
+    транзакции отключает и удаляет их. Если выгрузка не удалась, секция
+    остаётся подключённой и будет обработана при следующем запуске.
+    Восстановленные из архива секции пропускаются до release_partition.
+    Возвращает пути созданных архивов.
+    """
+    if retention_months is None:
+        retention_months = settings.ACTIVITY_LOG_RETENTION_MONTHS
+
+    cutoff = add_months(month_start(timezone.localdate()), -retention_months)
+    archive_dir = settings.ACTIVITY_LOG_ARCHIVE_DIR
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    rehydrated = rehydrated_partitions()
+
+    archives = []
+    for month, name in sorted(list_partitions().items()):
+        if month >= cutoff or month in rehydrated:
+            continue
+
+        path = archive_path(month)
+        # Старые секции не получают новых записей, поэтому выгрузка до отключения полна
+        dump_partition(name, path)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {TABLE} DETACH PARTITION {name}')
+            # Отложенные проверки внешних ключей не дают удалить таблицу в той же транзакции
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            cursor.execute(f'DROP TABLE {name}')
+        archives.append(path)
+
+    return archives
@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+from .models import ActivityLog
+
+
+class ActivityLogSerializer(serializers.ModelSerializer):
+    user = serializers.StringRelatedField()
+    content_type = serializers.SerializerMethodField()
+    object = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ActivityLog
+        fields = ['id', 'user', 'action', 'content_type', 'object_id', 'object', 'created_at']
+
+    def get_content_type(self, obj) -> str | None:
+        if obj.content_type_id is None:
+            return None
+        return '.'.join(obj.content_type.natural_key())
+
+    def get_object(self, obj) -> str | None:
+        # content_object загружается пачкой через GenericPrefetch во вьюсете
+        content_object = obj.content_object
+        return str(content_object) if content_object is not None else None
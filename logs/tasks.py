@@ -0,0 +1,29 @@
+from celery import shared_task
+from django.utils.dateparse import parse_datetime
+
+from .models import ActivityLog
+from .partitions import archive_partitions, ensure_partitions
+
+
+@shared_task
+def write_activity_logs(entries):
+    ActivityLog.objects.bulk_create([
+        ActivityLog(
+            user_id=entry['user_id'],
+            action=entry['action'],
+            content_type_id=entry['content_type_id'],
+            object_id=entry['object_id'],
+            created_at=parse_datetime(entry['created_at'])
+        )
+        for entry in entries
+    ])
+
+
+@shared_task
+def maintain_activity_log_partitions():
+    created = ensure_partitions()
+    archives = archive_partitions()
+    return {
+        'created': created,
+        'archived': [str(path) for path in archives],
+    }
@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from logs.activity import buffered_activity_log, log_activity
+from logs.models import ActivityLog
+from logs.tasks import write_activity_logs
+
+
+class ActivityLogWriterTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+
+    def test_entries_written_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            log_activity(user=self.user, action='Подтвердил email', content_object=self.user)
+
+        self.assertFalse(ActivityLog.objects.exists())
+
+        for callback in callbacks:
+            callback()
+
+        entry = ActivityLog.objects.get()
+        self.assertEqual(entry.action, 'Подтвердил email')
+        self.assertEqual(entry.content_object, self.user)
+
+    def test_buffer_is_flushed_with_one_insert(self):
+        ContentType.objects.get_for_model(self.user)
+
+        with self.assertNumQueries(1):
+            with buffered_activity_log():
+                with self.captureOnCommitCallbacks(execute=True):
+                    for i in range(5):
+                        log_activity(user=self.user, action=f'action {i}', content_object=self.user)
+
+        self.assertEqual(ActivityLog.objects.count(), 5)
+
+    def test_rolled_back_entries_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    log_activity(user=self.user, action='Отменил бронирование', content_object=self.user)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertFalse(ActivityLog.objects.exists())
+
+    @override_settings(ACTIVITY_LOG_ASYNC=True)
+    def test_async_mode_hands_entries_to_celery(self):
+        with mock.patch('logs.tasks.write_activity_logs.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                log_activity(user=self.user, action='Подтвердил email', content_object=self.user)
+
+        self.assertFalse(ActivityLog.objects.exists())
+        entries, = delay.call_args.args
+        write_activity_logs(entries)
+
+        entry = ActivityLog.objects.get()
+        self.assertEqual(entry.user, self.user)
+        self.assertEqual(entry.object_id, self.user.pk)
@@ -0,0 +1,99 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from booking.models import Booking, Place
+from logs.models import ActivityLog
+
+
+class ActivityFeedTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.other = get_user_model().objects.create_user(username='other', password='1234')
+        self.staff = get_user_model().objects.create_user(username='staff', password='1234', is_staff=True)
+        self.place = Place.objects.create(name='Зал', open_time=time(8), close_time=time(20), capacity=10)
+        self.created_at = datetime(2030, 1, 10, 12, tzinfo=dt_timezone.utc)
+
+    def log(self, user, content_object, offset=0):
+        return ActivityLog.objects.create(
+            user=user,
+            action='Создал бронь',
+            content_object=content_object,
+            created_at=self.created_at + timedelta(minutes=offset)
+        )
+
+    def book(self, user, hour):
+        return Booking.objects.create(
+            user=user, place=self.place, date=datetime(2030, 1, 10).date(),
+            start_time=time(hour), end_time=time(hour + 1)
+        )
+
+    def test_user_sees_own_feed_newest_first(self):
+        first = self.log(self.user, self.user, offset=0)
+        second = self.log(self.user, self.place, offset=1)
+        self.log(self.other, self.other, offset=2)
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get('/api/logs/', {'user': self.other.pk})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([entry['id'] for entry in data['results']], [second.pk, first.pk])
+        self.assertEqual(data['results'][0]['content_type'], 'booking.place')
+        self.assertEqual(data['results'][0]['object'], str(self.place))
+        self.assertIsNone(data['next'])
+
+    def test_cursor_walks_entries_with_equal_timestamps(self):
+        entries = [self.log(self.user, self.user, offset=i // 3) for i in range(7)]
+        self.client.force_authenticate(self.user)
+
+        seen = []
+        url = '/api/logs/?page_size=2'
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(entry['id'] for entry in data['results'])
+            url = data['next']
+
+        expected = sorted(entries, key=lambda entry: (entry.created_at, entry.pk), reverse=True)
+        self.assertEqual(seen, [entry.pk for entry in expected])
+
+    def test_object_feed_for_staff(self):
+        booking = self.book(self.user, 10)
+        ActivityLog.objects.all().delete()
+        self.log(self.user, booking)
+        self.log(self.staff, booking, offset=1)
+        self.log(self.user, self.place)
+        self.client.force_authenticate(self.staff)
+
+        response = self.client.get('/api/logs/', {'content_type': 'booking.booking', 'object_id': booking.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [entry['user'] for entry in response.json()['results']],
+            [self.staff.username, self.user.username]
+        )
+
+    def test_content_objects_resolved_in_bulk(self):
+        for hour in range(10, 15):
+            self.log(self.user, self.book(self.user, hour), offset=hour)
+            self.log(self.user, self.user, offset=hour)
+        self.log(self.user, self.place)
+        ContentType.objects.get_for_model(Booking)
+        self.client.force_authenticate(self.user)
+
+        # страница журнала + по одному запросу на каждый тип объекта
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/logs/')
+
+        self.assertEqual(len(response.json()['results']), 11)
+
+    def test_invalid_params(self):
+        self.client.force_authenticate(self.staff)
+
+        self.assertEqual(self.client.get('/api/logs/', {'cursor': 'broken'}).status_code, 404)
+        self.assertEqual(self.client.get('/api/logs/', {'content_type': 'booking'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/logs/', {'user': 'x'}).status_code, 400)
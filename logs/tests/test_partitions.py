@@ -0,0 +1,85 @@
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from logs.models import ActivityLog
+from logs.partitions import (
+    add_months, archive_partitions, create_partition, ensure_partitions, list_partitions, month_start,
+)
+
+
+class ActivityLogPartitionsTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.archive_dir = Path(tempfile.mkdtemp())
+
+    def partition_of(self, entry):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT tableoid::regclass::text FROM logs_activitylog WHERE id = %s', [entry.pk]
+            )
+            return cursor.fetchone()[0]
+
+    def test_rows_are_routed_to_monthly_partitions(self):
+        ensure_partitions(months_ahead=1)
+        entry = ActivityLog.objects.create(user=self.user, action='Подтвердил email')
+
+        self.assertEqual(self.partition_of(entry), f'logs_activitylog_p{timezone.now():%Y%m}')
+        self.assertIn(add_months(month_start(timezone.localdate()), 1), list_partitions())
+
+    def test_default_partition_rows_move_to_new_partition(self):
+        created_at = datetime(2001, 3, 5, tzinfo=dt_timezone.utc)
+        entry = ActivityLog.objects.create(user=self.user, action='old', created_at=created_at)
+        self.assertEqual(self.partition_of(entry), 'logs_activitylog_default')
+
+        create_partition(created_at.date())
+
+        self.assertEqual(self.partition_of(entry), 'logs_activitylog_p200103')
+
+    def test_archive_and_rehydrate(self):
+        created_at = datetime(2001, 3, 5, tzinfo=dt_timezone.utc)
+        create_partition(created_at.date())
+        entry = ActivityLog.objects.create(user=self.user, action='old', created_at=created_at)
+        ActivityLog.objects.create(user=self.user, action='recent')
+
+        with override_settings(ACTIVITY_LOG_ARCHIVE_DIR=self.archive_dir):
+            archives = archive_partitions(retention_months=12)
+
+        self.assertEqual([path.name for path in archives], ['logs_activitylog_p200103.jsonl.gz'])
+        self.assertFalse(ActivityLog.objects.filter(pk=entry.pk).exists())
+        self.assertTrue(ActivityLog.objects.filter(action='recent').exists())
+
+        call_command('rehydrate_activity_log', str(archives[0]), stdout=StringIO())
+
+        restored = ActivityLog.objects.get(pk=entry.pk)
+        self.assertEqual(restored.action, 'old')
+        self.assertEqual(restored.user, self.user)
+        self.assertEqual(restored.created_at, created_at)
+
+        # Восстановленная секция не архивируется, пока её не отпустят
+        with override_settings(ACTIVITY_LOG_ARCHIVE_DIR=self.archive_dir):
+            self.assertEqual(archive_partitions(retention_months=12), [])
+            call_command('rehydrate_activity_log', release='2001-03', stdout=StringIO())
+            self.assertEqual(len(archive_partitions(retention_months=12)), 1)
+        self.assertFalse(ActivityLog.objects.filter(pk=entry.pk).exists())
+
+    def test_failed_dump_keeps_partition_attached(self):
+        created_at = datetime(2001, 3, 5, tzinfo=dt_timezone.utc)
+        create_partition(created_at.date())
+        entry = ActivityLog.objects.create(user=self.user, action='old', created_at=created_at)
+
+        with override_settings(ACTIVITY_LOG_ARCHIVE_DIR=self.archive_dir), \
+                mock.patch('logs.partitions.gzip.open', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                archive_partitions(retention_months=12)
+
+        self.assertIn(month_start(created_at.date()), list_partitions())
+        self.assertTrue(ActivityLog.objects.filter(pk=entry.pk).exists())
@@ -1,3 +1,64 @@
-from django.shortcuts import render
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import mixins, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.viewsets import GenericViewSet
 
-# Create your views here.
+from booking.models import Booking, Place
+from users.models import CustomUser
+from .models import ActivityLog
+from .pagination import ActivityLogPagination
+from .serializers import ActivityLogSerializer
+
+
+@extend_schema(
+    summary="Лента действий",
+    description=(
+        "Журнал действий пользователя или объекта, от новых к старым. "
+        "Обычный пользователь видит только свои действия, сотрудники - любые."
+    ),
+    parameters=[
+        OpenApiParameter(name='user', description='ID пользователя (только для сотрудников)', required=False, type=int),
+        OpenApiParameter(name='content_type', description='Тип объекта, например booking.booking', required=False, type=str),
+        OpenApiParameter(name='object_id', description='ID объекта (вместе с content_type)', required=False, type=int),
+    ],
+    tags=["Журнал"]
+)
+class ActivityLogViewSet(mixins.ListModelMixin, GenericViewSet):
+    serializer_class = ActivityLogSerializer
+    pagination_class = ActivityLogPagination
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = ActivityLog.objects.select_related('user', 'content_type').prefetch_related(
+            GenericPrefetch('content_object', [
+                Booking.objects.select_related('user', 'place'),
+                Place.objects.all(),
+                CustomUser.objects.all(),
+            ])
+        )
+
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+        elif params.get('user'):
+            queryset = queryset.filter(user_id=self.parse_id('user'))
+
+        if params.get('content_type'):
+            try:
+                app_label, model = params['content_type'].split('.')
+                content_type = ContentType.objects.get_by_natural_key(app_label, model)
+            except (ValueError, ContentType.DoesNotExist):
+                raise ValidationError({"error": "Неверное значение параметра 'content_type'"})
+            queryset = queryset.filter(content_type=content_type)
+            if params.get('object_id'):
+                queryset = queryset.filter(object_id=self.parse_id('object_id'))
+
+        return queryset
+
+    def parse_id(self, name):
+        try:
+            return int(self.request.query_params[name])
+        except ValueError:
+            raise ValidationError({"error": f"Неверное значение параметра '{name}'"})
@@ -0,0 +1,112 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from booking.models import Booking, BookingStatus, Place
+
+
+class UserStatsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='testuser', password='1234')
+        self.place = Place.objects.create(name='Зал', open_time=time(8), close_time=time(20), capacity=5)
+        self.other_place = Place.objects.create(name='Другой', open_time=time(8), close_time=time(20), capacity=5)
+        self.client.force_authenticate(self.user)
+
+    def book(self, day, place=None, status=BookingStatus.COMPLETED):
+        return Booking.objects.create(
+            user=self.user, place=place or self.place, date=day,
+            start_time=time(10), end_time=time(11), status=status
+        )
+
+    def test_me_counts_in_one_query(self):
+        today = date.today()
+        self.book(today - timedelta(days=1))
+        self.book(today + timedelta(days=1), status=BookingStatus.PENDING)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/users/me/')
+
+        self.assertEqual(response.json()['total_bookings'], 2)
+        self.assertEqual(response.json()['completed_bookings'], 1)
+
+    def test_stats_in_one_query(self):
+        today = date.today()
+        self.book(today - timedelta(days=2))
+        self.book(today - timedelta(days=20), place=self.other_place)
+        self.book(today - timedelta(days=200))
+        self.book(today - timedelta(days=500))
+        self.book(today - timedelta(days=3), status=BookingStatus.CANCELLED)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/users/me/stats/', {
+                'from': (today - timedelta(days=30)).isoformat(), 'to': today.isoformat()
+            })
+
+        self.assertEqual(response.json(), {
+            'completed_between': 2,
+            'week': 1,
+            'month': 2,
+            'year': 3,
+            'total_completed': 4,
+            'unique_places_visited': 2,
+        })
+
+    def test_single_period(self):
+        self.book(date.today() - timedelta(days=2))
+
+        response = self.client.get('/api/users/me/stats/', {'period': 'month'})
+
+        self.assertEqual(response.json(), {'month': 1, 'total_completed': 1, 'unique_places_visited': 1})
+
+    def test_histogram_fills_empty_periods(self):
+        self.book(date(2030, 1, 6))
+        self.book(date(2030, 1, 7), place=self.other_place)
+        self.book(date(2030, 1, 21))
+        self.book(date(2030, 1, 22), status=BookingStatus.CANCELLED)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/users/me/stats/', {'bucket': 'week', 'from': '2030-01-01', 'to': '2030-01-25'})
+
+        self.assertEqual(response.json(), {'bucket': 'week', 'series': [
+            {'period': '2029-12-31', 'completed': 1},
+            {'period': '2030-01-07', 'completed': 1},
+            {'period': '2030-01-14', 'completed': 0},
+            {'period': '2030-01-21', 'completed': 1},
+        ]})
+
+    def test_histogram_defaults_to_last_twelve_months(self):
+        today = date.today()
+        self.book(today - timedelta(days=10))
+        self.book(today - timedelta(days=400))
+
+        response = self.client.get('/api/users/me/stats/', {'bucket': 'month'})
+
+        series = response.json()['series']
+        self.assertEqual(series[0]['period'], (today - timedelta(days=365)).replace(day=1).isoformat())
+        self.assertEqual(series[-1]['period'], today.replace(day=1).isoformat())
+        self.assertEqual(sum(item['completed'] for item in series), 1)
+
+    def test_histogram_by_month_within_range(self):
+        self.book(date(2029, 12, 31))
+        self.book(date(2030, 1, 5))
+        self.book(date(2030, 1, 25))
+
+        response = self.client.get('/api/users/me/stats/', {'bucket': 'month', 'from': '2030-01-01', 'to': '2030-03-15'})
+
+        self.assertEqual(response.json()['series'], [
+            {'period': '2030-01-01', 'completed': 2},
+            {'period': '2030-02-01', 'completed': 0},
+            {'period': '2030-03-01', 'completed': 0},
+        ])
+
+    def test_invalid_histogram_params(self):
+        for params in (
+            {'bucket': 'year'},
+            {'bucket': 'day', 'from': '2030-02-01', 'to': '2030-01-01'},
+            {'bucket': 'day', 'from': '2000-01-01', 'to': '2030-01-01'},
+            {'bucket': 'month', 'from': '2029-01-01', 'to': '2030-01-02'},
+        ):
+            self.assertEqual(self.client.get('/api/users/me/stats/', params).status_code, 400)
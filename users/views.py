@@ -3,6 +3,8 @@ from datetime import datetime, timedelta
 from django.utils.http import urlsafe_base64_decode
 from django.contrib.auth.tokens import default_token_generator
 from django.http import Http404
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
 from rest_framework import views
 from rest_framework import viewsets
 from rest_framework.viewsets import GenericViewSet
@@ -13,7 +15,17 @@ from rest_framework.permissions import IsAuthenticated
 from .serializers import UserRegistrationSerializer, UserPublicSerializer, UserUpdateSerializer
 from users.models import CustomUser
 from booking.models import Booking, BookingStatus
-from logs.models import ActivityLog
+from logs.activity import log_activity
+
+
+STATS_BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+# Гистограмма без from/to строится за последние 12 месяцев
+STATS_DEFAULT_DAYS = 365
+STATS_MAX_DAYS = 366
 
 
 class RegisterView(views.APIView):
@@ -44,7 +56,7 @@ class ConfirmEmailView(views.APIView):
             user.is_active = True
             user.save()
 
-            ActivityLog.objects.create(
+            log_activity(
                 user=user,
                 action='Подтвердил email',
                 content_object=user
@@ -64,9 +76,10 @@ class UserViewSet(GenericViewSet):
 
         if request.method == 'GET':
             data = UserPublicSerializer(user).data
-            bookings = Booking.objects.filter(user=user)
-            data['total_bookings'] = bookings.count()
-            data['completed_bookings'] = bookings.filter(status=BookingStatus.COMPLETED).count()
+            data.update(Booking.objects.filter(user=user).aggregate(
+                total_bookings=Count('id'),
+                completed_bookings=Count('id', filter=Q(status=BookingStatus.COMPLETED))
+            ))
             return Response(data, status=200)
 
         elif request.method == 'PATCH':
@@ -81,6 +94,7 @@ class UserViewSet(GenericViewSet):
         data = {}
 
         period = request.query_params.get('period')
+        bucket = request.query_params.get('bucket')
         from_date_str = request.query_params.get('from')
         to_date_str = request.query_params.get('to')
 
@@ -88,7 +102,8 @@ class UserViewSet(GenericViewSet):
         if period and period not in valid_periods:
             return Response({"error": "Неверное значение параметра 'period'"}, status=400)
 
-        total_completed = Booking.objects.filter(user=user, status=BookingStatus.COMPLETED)
+        if bucket and bucket not in STATS_BUCKETS:
+            return Response({"error": "Неверное значение параметра 'bucket'"}, status=400)
 
         from_date = to_date = None
         if from_date_str and to_date_str:
@@ -100,24 +115,78 @@ class UserViewSet(GenericViewSet):
 
         qs = Booking.objects.filter(user=user, status=BookingStatus.COMPLETED)
 
-        if from_date and to_date:
-            data["completed_between"] = qs.filter(date__gte=from_date, date__lte=to_date).count()
+        if bucket:
+            if not (from_date and to_date):
+                to_date = datetime.now().date()
+                from_date = to_date - timedelta(days=STATS_DEFAULT_DAYS)
+
+            if from_date > to_date:
+                return Response({"error": "Дата 'from' должна быть не позже 'to'"}, status=400)
+
+            if (to_date - from_date).days >= STATS_MAX_DAYS:
+                return Response({"error": f"Диапазон не может превышать {STATS_MAX_DAYS} дней"}, status=400)
 
+            return Response(completed_histogram(qs, bucket, from_date, to_date), status=200)
+
+        # Все счётчики считаются одним запросом через условные агрегаты
         now = datetime.now().date()
-        period_counts = {
-            "week": qs.filter(date__gte=now - timedelta(days=7)).count(),
-            "month": qs.filter(date__gte=now - timedelta(days=30)).count(),
-            "year": qs.filter(date__gte=now - timedelta(days=365)).count()
+        period_starts = {
+            "week": now - timedelta(days=7),
+            "month": now - timedelta(days=30),
+            "year": now - timedelta(days=365)
+        }
+        aggregates = {
+            name: Count('id', filter=Q(date__gte=start))
+            for name, start in period_starts.items()
+            if not period or name == period
         }
+        if from_date and to_date:
+            aggregates["completed_between"] = Count('id', filter=Q(date__gte=from_date, date__lte=to_date))
+        aggregates["total_completed"] = Count('id')
+        aggregates["unique_places_visited"] = Count('place', distinct=True)
 
-        if period:
-            data[period] = period_counts[period]
-        else:
-            data.update(period_counts)
+        counts = qs.aggregate(**aggregates)
 
-        data["total_completed"] = total_completed.count()
-        data["unique_places_visited"] = qs.values("place").distinct().count()
+        if from_date and to_date:
+            data["completed_between"] = counts.pop("completed_between")
+        data.update(counts)
 
         return Response(data, status=200)
 
 
+def truncate_date(value, bucket):
+    if bucket == 'week':
+        return value - timedelta(days=value.weekday())
+    if bucket == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def next_period(value, bucket):
+    if bucket == 'day':
+        return value + timedelta(days=1)
+    if bucket == 'week':
+        return value + timedelta(days=7)
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def completed_histogram(bookings, bucket, from_date, to_date):
+    """
+    Количество завершённых броней по дням, неделям или месяцам одним GROUP BY.
+    Пустые периоды внутри диапазона заполняются нулями.
+    """
+    counts = dict(
+        bookings.filter(date__gte=from_date, date__lte=to_date)
+        .annotate(period=STATS_BUCKETS[bucket]('date'))
+        .values('period')
+        .annotate(completed=Count('id'))
+        .values_list('period', 'completed')
+    )
+
+    period, last = truncate_date(from_date, bucket), truncate_date(to_date, bucket)
+    series = []
+    while period <= last:
+        series.append({"period": period.isoformat(), "completed": counts.get(period, 0)})
+        period = next_period(period, bucket)
+
+    return {"bucket": bucket, "series": series}